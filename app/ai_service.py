@@ -1,10 +1,22 @@
 import os
+import json
+import threading
 from openai import OpenAI
 from dotenv import load_dotenv
-import ollama
-from constants import SCHEMA_PROMPT, DETECT_INTENT_PROMPT, TABLE_SELECTION_PROMPT
+from constants import DETECT_INTENT_PROMPT, TABLE_SELECTION_PROMPT, REPAIR_JSON_PROMPT
+from metrics import timed, record_openai_usage, record_cache, debug_print, SQL_PROMPT_TOKENS
+from prompt_builder import COMPACT_SCHEMA_PROMPT, build_sql_prompt, count_tokens
+from structured_output import IntentResult, TableSelection, StructuredOutputError, parse_model
+from singleflight import SingleFlight
+from sql_backends import SQLBackendPool
+from intent_classifier import LocalIntentClassifier, INTENT_CONFIDENCE_THRESHOLD, intent_label, label_to_intent
+from conversation import ConversationStore, is_follow_up, tables_mentioned, build_follow_up_context
 
 load_dotenv()
+# OpenAI JSON mode; disable for OpenAI-compatible servers that do not support response_format
+OPENAI_JSON_MODE = os.getenv("OPENAI_JSON_MODE", "true").lower() == "true"
+# JSONL file collecting (text, LLM label) pairs for scripts/train_intent_classifier.py
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH", "")
 
 class AIService:
     def __init__(self):
@@ -12,22 +24,45 @@ class AIService:
             api_key=os.getenv("OPENAI_API_KEY"),
             base_url=os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
         )
+        self.intent_classifier = LocalIntentClassifier.load()
+        self._intent_log_lock = threading.Lock()
+        # Identical concurrent LLM calls share one in-flight request
+        self._inflight = SingleFlight("llm")
+        self.sql_backends = SQLBackendPool.from_env()
+        self.conversations = ConversationStore()
 
     def detect_intent(
             self,
             user_input: str, 
             system_prompt: str = DETECT_INTENT_PROMPT
             ) -> dict:
+        # Fast path: the local classifier answers when confident, otherwise fall back to the LLM
+        if self.intent_classifier is not None and system_prompt == DETECT_INTENT_PROMPT:
+            with timed("intent_local"):
+                label, confidence = self.intent_classifier.predict(user_input)
+            confident = confidence >= INTENT_CONFIDENCE_THRESHOLD
+            record_cache("local_intent", confident)
+            if confident:
+                return label_to_intent(label, user_input)
+
+        return self._inflight.do(("intent", system_prompt, user_input),
+                                 self._detect_intent_llm, user_input, system_prompt)
+
+    def _detect_intent_llm(self, user_input: str, system_prompt: str) -> dict:
         try:
-            response = self.client.chat.completions.create(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o"),
+            result = self._structured_completion(
+                stage="intent_llm",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_input}
                 ],
+                result_model=IntentResult,
                 temperature=0.3
             )
-            return eval(response.choices[0].message.content)
+            intent = result.model_dump()
+            if INTENT_LOG_PATH and system_prompt == DETECT_INTENT_PROMPT:
+                self._log_intent_label(user_input, intent)
+            return intent
         except Exception as e:
             print(f"Intent detection error: {e}")
             return {
@@ -38,54 +73,115 @@ class AIService:
                 }
             }
     
+    def _log_intent_label(self, user_input: str, intent: dict) -> None:
+        record = {"text": user_input, "label": intent_label(intent["intent"]), "intent": intent["intent"]}
+        try:
+            with self._intent_log_lock, open(INTENT_LOG_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Intent log error: {e}")
+
     def _table_selections(
             self, 
             nl_sql_prompt: str,
             table_selection_prompt: str = TABLE_SELECTION_PROMPT,
-            full_schema: str = SCHEMA_PROMPT) -> list:
+            full_schema: str = COMPACT_SCHEMA_PROMPT) -> list:
         """
-        Given a natural language SQL prompt and the full DB schema, return relevant tables and their DDL statements.
+        Given a natural language SQL prompt and the DB schema, return the relevant tables.
         Uses OpenAI GPT model for inference.
         """
         system_prompt = table_selection_prompt + full_schema
 
         try:
-            response = self.client.chat.completions.create(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o"),
+            result = self._structured_completion(
+                stage="table_selection",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": nl_sql_prompt}
                 ],
+                result_model=TableSelection,
                 temperature=0.2
             )
-            print(response, "#!@#!@#!@#!")
-            content = response.choices[0].message.content
-            return eval(content)  # or use json.loads() if strict JSON is enforced
+            return [table.model_dump(by_alias=True) for table in result.tables]
         except Exception as e:
             print(f"Table extraction error: {e}")
             return []
 
+    def _structured_completion(self, stage: str, messages: list, result_model: type, temperature: float):
+        """
+        Runs a chat completion and validates its JSON content against `result_model`. If the
+        output does not parse, the model is asked once to repair it before giving up.
+        """
+        model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        extra_args = {"response_format": {"type": "json_object"}} if OPENAI_JSON_MODE else {}
 
-    def generate_sql_query(self, natural_language_prompt: str) -> str:
+        for attempt in range(2):
+            with timed(stage):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    **extra_args
+                )
+            record_openai_usage(model, response)
+            debug_print(response)
+            content = response.choices[0].message.content
+            try:
+                return parse_model(content, result_model)
+            except StructuredOutputError as e:
+                if attempt:
+                    raise
+                messages = messages + [
+                    {"role": "assistant", "content": content or ""},
+                    {"role": "user", "content": REPAIR_JSON_PROMPT.format(error=e)}
+                ]
+
+    def generate_sql_query(self, natural_language_prompt: str, session_id: str = None) -> str:
         """
-        Uses local OLLAMA model (sqlcoder2) to convert a natural language question into SQL.
+        Converts a natural language question into SQL using the SQL backend pool
+        (local OLLAMA sqlcoder2 by default, see sql_backends.py). With a `session_id`,
+        follow-up questions reuse the previous turn's tables and SQL as context.
         """
+        return self._inflight.do(("sql", session_id, natural_language_prompt),
+                                 self._generate_sql_query, natural_language_prompt, session_id)
+
+    def _generate_sql_query(self, natural_language_prompt: str, session_id: str = None) -> str:
         try:
-            response = ollama.chat(
-                model='pxlksr/defog_sqlcoder-7b-2:F16',
-                messages=[
+            last_turn = self.conversations.last_turn(session_id) if session_id else None
+            follow_up = is_follow_up(natural_language_prompt, last_turn)
+            # Reuse the previous tables unless the follow-up brings in tables they lack
+            reuse_tables = follow_up and all(
+                name in last_turn["tables"] for name in tables_mentioned(natural_language_prompt))
+            if session_id:
+                record_cache("conversation_tables", reuse_tables)
+
+            if reuse_tables:
+                tables = [{"table": name} for name in last_turn["tables"]]
+            else:
+                tables = self._table_selections(nl_sql_prompt=natural_language_prompt)
+
+            system_prompt, prompt_stats = build_sql_prompt(natural_language_prompt, tables)
+            if follow_up:
+                system_prompt += "\n" + build_follow_up_context(last_turn)
+                prompt_stats["prompt_tokens"] = count_tokens(system_prompt) + count_tokens(natural_language_prompt)
+            SQL_PROMPT_TOKENS.observe(prompt_stats["prompt_tokens"])
+            debug_print(prompt_stats)
+            with timed("sql_generation"):
+                content = self.sql_backends.generate(messages=[
                     {
                         'role': 'system',
-                        'content': 'You are a SQL expert who writes syntactically correct SQL queries for sqlite.'+
-                        f'Use following Schema for reference: {self._table_selections(nl_sql_prompt=natural_language_prompt)}'
+                        'content': system_prompt
                     },
                     {
                         'role': 'user',
                         'content': natural_language_prompt
                     }
-                ]
-            )
-            return response['message']['content'].strip()
+                ])
+            sql = content.strip()
+            if session_id:
+                self.conversations.record_query(session_id, natural_language_prompt,
+                                                [t["table"] for t in tables], sql)
+            return sql
         except Exception as e:
             print(f"SQL generation error: {e}")
             return "ERROR: Failed to generate SQL."
@@ -89,19 +89,23 @@ CREATE TABLE shifts (
 `encounters`
 CREATE TABLE encounters (
     encounter_id SERIAL PRIMARY KEY,
-    patient_id INT,
+    patient_id INT REFERENCES patients(patient_id),
     provider_id INT REFERENCES providers(provider_id),
     hospital_id INT REFERENCES hospitals(hospital_id),
     department_id INT REFERENCES departments(department_id),
     site_id INT REFERENCES sites(site_id),
     encounter_date TIMESTAMP,
     chief_complaint TEXT,
-    diagnosis_code VARCHAR(20),
+    diagnosis_code VARCHAR(20) REFERENCES diagnosis_codes(code),
     discharge_disposition VARCHAR(100),
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
 ---
+`encounters_fts`
+-- SQLite FTS5 full-text index over encounters.chief_complaint (rowid = encounter_id).
+CREATE VIRTUAL TABLE encounters_fts USING fts5(chief_complaint, content='encounters', content_rowid='encounter_id');
+---
 `performance_targets`
 CREATE TABLE performance_targets (
     target_id SERIAL PRIMARY KEY,
@@ -142,7 +146,7 @@ CREATE TABLE hospital_admins (
  `audit_logs`
 CREATE TABLE audit_logs (
     log_id SERIAL PRIMARY KEY,
-    user_id INT,
+    user_id INT REFERENCES hospital_admins(admin_id),
     action VARCHAR(100),
     entity_type VARCHAR(50),
     entity_id INT,
@@ -150,6 +154,10 @@ CREATE TABLE audit_logs (
     details TEXT
 );
 ---
+`audit_logs_fts`
+-- SQLite FTS5 full-text index over audit_logs.details (rowid = log_id).
+CREATE VIRTUAL TABLE audit_logs_fts USING fts5(details, content='audit_logs', content_rowid='log_id');
+---
 `diagnosis_codes`
 
 CREATE TABLE diagnosis_codes (
@@ -202,6 +210,10 @@ CREATE TABLE provider_feedback (
     submitted_at TIMESTAMP DEFAULT NOW()
 );
 ---
+`provider_feedback_fts`
+-- SQLite FTS5 full-text index over provider_feedback.comment (rowid = feedback_id).
+CREATE VIRTUAL TABLE provider_feedback_fts USING fts5(comment, content='provider_feedback', content_rowid='feedback_id');
+---
 `provider_leaves`
 CREATE TABLE provider_leaves (
     leave_id SERIAL PRIMARY KEY,
@@ -213,6 +225,10 @@ CREATE TABLE provider_leaves (
     created_at TIMESTAMP DEFAULT NOW()
 );
 ---
+`provider_leaves_fts`
+-- SQLite FTS5 full-text index over provider_leaves.reason (rowid = leave_id).
+CREATE VIRTUAL TABLE provider_leaves_fts USING fts5(reason, content='provider_leaves', content_rowid='leave_id');
+---
 `document_uploads`
 CREATE TABLE document_uploads (
     doc_id SERIAL PRIMARY KEY,
@@ -220,7 +236,7 @@ CREATE TABLE document_uploads (
     file_name VARCHAR(255),
     file_type VARCHAR(50),
     uploaded_at TIMESTAMP DEFAULT NOW(),
-    uploaded_by INT
+    uploaded_by INT REFERENCES hospital_admins(admin_id)
 );
 """
 
@@ -241,14 +257,24 @@ DETECT_INTENT_PROMPT = """
     """
 
 TABLE_SELECTION_PROMPT = """
-        You are a database assistant. Given a full database schema (including CREATE TABLE statements) and a user question in natural language,
-        your task is to return a JSON list of relevant tables and their DDL statements.
+        You are a database assistant. Given a database schema (one table per line: table(column type, ...),
+        "pk" marks primary keys and "->" foreign keys) and a user question in natural language,
+        your task is to return a JSON object naming the relevant tables, including any needed for joins.
 
-        Respond in this format:
-        [
-        {{"table": "table_name", "schema": "CREATE TABLE ...;"}},
-        ...
-        ]
+        Respond with JSON only, in this format:
+        {"tables": [{"table": "table_name"}, ...]}
 
         Here is the database schema:\n
-        """
\ No newline at end of file
+        """
+
+FTS_SEARCH_PROMPT = """
+    For text search on encounters.chief_complaint, provider_feedback.comment, audit_logs.details or
+    provider_leaves.reason, never use LIKE '%...%'. Use the matching *_fts table instead, joined on rowid:
+    SELECT e.* FROM encounters e JOIN encounters_fts f ON f.rowid = e.encounter_id
+    WHERE encounters_fts MATCH '"chest pain"';
+    """
+
+REPAIR_JSON_PROMPT = """
+    Your previous reply could not be parsed: {error}
+    Reply again with only the corrected JSON, matching the requested schema exactly.
+    """
@@ -0,0 +1,117 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+from prompt_builder import SCHEMA
+
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", 1000))
+CONVERSATION_TTL_S = float(os.getenv("CONVERSATION_TTL_S", 3600))
+CONVERSATION_MAX_TURNS = int(os.getenv("CONVERSATION_MAX_TURNS", 5))
+
+# Openers that only make sense as a continuation ("now ...", "what about ..."), and
+# reshaping verbs when aimed at the previous result ("sort them", "group by ...")
+_FOLLOW_UP_START_RE = re.compile(
+    r"^\s*(now|and|also|then|but|instead|same|only|just|what about|how about)\b|"
+    r"^\s*(break|split|group|filter|sort|order|limit|show|exclude|include)\s+"
+    r"(it|them|that|those|these|the results?|by|per)\b", re.I)
+# Anaphora pointing at the previous result. Bare "that"/"it" are not enough: they are
+# usually relative pronouns ("hospitals that have an ICU", "is it possible to ...")
+_REFERENCE_RE = re.compile(
+    r"\b(it|them|that|those|these)\s+(down|up|out|over|again|instead|by|per)\b|"
+    r"\b(those|these)\s*[?.!]?\s*$|"
+    r"\bthe (same|previous|above|last|earlier) (query|question|results?|one|list)\b", re.I)
+_WORD_RE = re.compile(r"[a-z]+")
+
+def _singular(word: str) -> str:
+    return word[:-1] if word.endswith("s") else word
+
+# Word forms that name a table, e.g. "department" -> departments, "feedback" -> provider_feedback
+_TABLE_WORDS = {}
+for _name, _table in SCHEMA.items():
+    if _table["fts"]:
+        continue
+    _TABLE_WORDS.setdefault(_singular(_name.split("_")[-1]), []).append(_name)
+    _TABLE_WORDS.setdefault(_singular(_name), []).append(_name)
+
+def is_follow_up(question: str, last_turn: dict) -> bool:
+    """
+    Heuristic for questions that refine the previous one ("now break that down by
+    department") rather than starting a new topic.
+    """
+    if last_turn is None:
+        return False
+    return bool(_FOLLOW_UP_START_RE.search(question) or _REFERENCE_RE.search(question))
+
+def tables_mentioned(question: str) -> list:
+    tables = []
+    for word in _WORD_RE.findall(question.lower()):
+        for name in _TABLE_WORDS.get(_singular(word), []):
+            if name not in tables:
+                tables.append(name)
+    return tables
+
+def build_follow_up_context(turn: dict) -> str:
+    """
+    Compact description of the previous turn for the SQL model: its question, SQL and
+    result shape, instead of re-deriving everything from the full schema.
+    """
+    lines = [f"Previous question: {turn['question']}", f"Previous SQL: {turn['sql']}"]
+    summary = turn.get("result")
+    if summary:
+        lines.append(f"Previous result: {summary['row_count']} rows, columns {', '.join(summary['columns'])}")
+    lines.append("The new question refines the previous one; modify the previous SQL accordingly.")
+    return "\n".join(lines)
+
+class ConversationStore:
+    """
+    Per-session memory of the last few resolved questions (tables, SQL, result summary).
+    Bounded by session count (LRU) and idle TTL.
+    """
+    def __init__(self, max_sessions: int = CONVERSATION_MAX_SESSIONS, ttl_s: float = CONVERSATION_TTL_S,
+                 max_turns: int = CONVERSATION_MAX_TURNS):
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self.max_turns = max_turns
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str, create: bool = False):
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is not None and now - session["updated"] > self.ttl_s:
+            del self._sessions[session_id]
+            session = None
+        if session is None and create:
+            session = {"turns": deque(maxlen=self.max_turns), "updated": now}
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        if session is not None:
+            session["updated"] = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def last_turn(self, session_id: str):
+        with self._lock:
+            session = self._session(session_id)
+            return session["turns"][-1] if session and session["turns"] else None
+
+    def record_query(self, session_id: str, question: str, tables: list, sql: str) -> None:
+        with self._lock:
+            self._session(session_id, create=True)["turns"].append(
+                {"question": question, "tables": tables, "sql": sql, "result": None})
+
+    def record_result(self, session_id: str, sql: str, columns: list, rows: list) -> None:
+        with self._lock:
+            session = self._session(session_id)
+            if session is None:
+                return
+            for turn in reversed(session["turns"]):
+                if turn["sql"].strip().rstrip(";") == sql.strip().rstrip(";"):
+                    turn["result"] = {"columns": columns, "row_count": len(rows)}
+                    return
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -1,19 +1,75 @@
 import gradio as gr
 import os
-from ai_service import AIService
+import httpx
 
-ai_service = AIService()
+BACKEND_URL = os.getenv("BACKEND_URL", f"http://localhost:{os.getenv('BE_PORT', 8000)}")
+BACKEND_TIMEOUT_S = float(os.getenv("BACKEND_TIMEOUT_S", 60))
+# Chat events handled at once; further messages wait in a queue of FE_QUEUE_SIZE
+FE_CONCURRENCY_LIMIT = int(os.getenv("FE_CONCURRENCY_LIMIT", 16))
+FE_QUEUE_SIZE = int(os.getenv("FE_QUEUE_SIZE", 256))
+# Turns kept per session, so long conversations do not grow memory without bound
+MAX_HISTORY_TURNS = int(os.getenv("MAX_HISTORY_TURNS", 20))
 
-def chat_with_bot(user_input, history):
+_client = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared pooled client for the backend API, created on first use inside Gradio's event loop.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=BACKEND_URL,
+            timeout=BACKEND_TIMEOUT_S,
+            limits=httpx.Limits(max_connections=FE_CONCURRENCY_LIMIT,
+                                max_keepalive_connections=FE_CONCURRENCY_LIMIT)
+        )
+    return _client
+
+# Rows of a query result echoed back in the chat
+RESULT_PREVIEW_ROWS = int(os.getenv("RESULT_PREVIEW_ROWS", 5))
+
+async def _post(path: str, payload: dict):
+    response = await get_client().post(path, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+async def _answer_sql(user_input: str, session_id: str) -> str:
+    """
+    NL2SQL for one session; the backend remembers the tables, SQL and result shape so
+    follow-up questions can build on them. Only a single SELECT is run, read-only;
+    anything else is shown for review and never executed from the chat.
+    """
+    sql = await _post("/NL2SQL", {"userInput": user_input, "sessionId": session_id})
+    if not isinstance(sql, str) or sql.startswith("ERROR"):
+        return f"❌ Could not generate SQL: {sql}"
+    if not sql.lstrip().lower().startswith("select"):
+        return f"🧾 SQL:\n{sql}\n\n⚠️ Not executed: only SELECT queries run from the chat."
+    try:
+        result = await _post("/execute", {"query": sql, "sessionId": session_id, "readOnly": True})
+    except httpx.HTTPStatusError as e:
+        return f"🧾 SQL:\n{sql}\n\n❌ Query failed: {e.response.text}"
+    preview = "\n".join(str(tuple(row)) for row in result["rows"][:RESULT_PREVIEW_ROWS])
+    return (f"🧾 SQL:\n{sql}\n\n📊 {len(result['rows'])} rows, columns: {', '.join(result['columns'])}"
+            f"\n{preview}")
+
+async def chat_with_bot(user_input, history, request: gr.Request):
     history = history or []
+    session_id = request.session_hash if request else None
 
     try:
-        intent_result = ai_service.detect_intent(user_input)
-        bot_reply = f"🔍 Detected intent:\n{intent_result}"
+        intent = await _post("/intent_classify", {"userInput": user_input})
+        if intent.get("intent", {}).get("SQL_QUERY", [False])[0]:
+            bot_reply = await _answer_sql(user_input, session_id)
+        else:
+            bot_reply = f"🔍 Detected intent:\n{intent}"
     except Exception as e:
         bot_reply = f"❌ Error: {str(e)}"
 
-    history.append((user_input, bot_reply))
+    history.append({"role": "user", "content": user_input})
+    history.append({"role": "assistant", "content": bot_reply})
+    # One turn is a user message plus the reply
+    history = history[-2 * MAX_HISTORY_TURNS:]
     return history, history
 
 def start_gradio_chat_ui():
@@ -26,6 +82,7 @@ def start_gradio_chat_ui():
         msg.submit(chat_with_bot, [msg, state], [chatbot, state])
         msg.submit(lambda: "", None, msg)
 
+    demo.queue(default_concurrency_limit=FE_CONCURRENCY_LIMIT, max_size=FE_QUEUE_SIZE)
     port = int(os.getenv("FE_PORT", 8080))
     demo.launch(server_name="0.0.0.0", server_port=port, share=False)
 
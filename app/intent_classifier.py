@@ -0,0 +1,105 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", "./data/intent_model.json")
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", 0.9))
+
+INTENT_LABELS = ["SQL_QUERY", "AUDIO_GENERATION", "DATA_GENERATION", "NONE"]
+
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+def intent_label(intent: dict) -> str:
+    """
+    Collapses an intent dict returned by the LLM into a single training label.
+    """
+    sql_query = intent.get("SQL_QUERY") or [False]
+    if sql_query[0]:
+        return "SQL_QUERY"
+    if intent.get("AUDIO_GENERATION"):
+        return "AUDIO_GENERATION"
+    if intent.get("DATA_GENERATION") or intent.get("GRAPHIC_GENERATIONS"):
+        return "DATA_GENERATION"
+    return "NONE"
+
+def label_to_intent(label: str, user_input: str) -> dict:
+    return {
+        "intent": {
+            "AUDIO_GENERATION": label == "AUDIO_GENERATION",
+            "SQL_QUERY": [label == "SQL_QUERY", ""],
+            "DATA_GENERATION": user_input if label == "DATA_GENERATION" else "",
+            "GRAPHIC_GENERATIONS": user_input if label == "DATA_GENERATION" else ""
+        }
+    }
+
+class LocalIntentClassifier:
+    """
+    Char n-gram TF-IDF + linear model exported by scripts/train_intent_classifier.py.
+    Scoring is plain Python over sparse dicts, so a short message classifies in
+    microseconds without importing scikit-learn at serving time.
+    """
+    def __init__(self, model: dict):
+        self.ngram_range = tuple(model["ngram_range"])
+        self.sublinear_tf = model["sublinear_tf"]
+        self.classes = model["classes"]
+        self.intercepts = model["intercept"]
+        # vocabulary term -> (idf, [weight per class row])
+        self.terms = {
+            term: (model["idf"][index], [row[index] for row in model["coef"]])
+            for term, index in model["vocabulary"].items()
+        }
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH):
+        if not path or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _ngrams(self, text: str) -> list:
+        # Mirrors sklearn's `char_wb` analyzer with lowercase=True
+        text = _WHITE_SPACES.sub(" ", text.lower())
+        min_n, max_n = self.ngram_range
+        ngrams = []
+        for w in text.split():
+            w = " " + w + " "
+            w_len = len(w)
+            for n in range(min_n, max_n + 1):
+                offset = 0
+                ngrams.append(w[offset:offset + n])
+                while offset + n < w_len:
+                    offset += 1
+                    ngrams.append(w[offset:offset + n])
+                if offset == 0:
+                    break
+        return ngrams
+
+    def predict_proba(self, text: str) -> dict:
+        features = {}
+        for term, count in Counter(self._ngrams(text)).items():
+            entry = self.terms.get(term)
+            if entry is not None:
+                tf = 1 + math.log(count) if self.sublinear_tf else count
+                features[term] = tf * entry[0]
+
+        norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+        scores = list(self.intercepts)
+        for term, value in features.items():
+            weights = self.terms[term][1]
+            for row in range(len(scores)):
+                scores[row] += weights[row] * value / norm
+
+        if len(scores) == 1:
+            positive = 1 / (1 + math.exp(-scores[0]))
+            return {self.classes[0]: 1 - positive, self.classes[1]: positive}
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return {label: e / total for label, e in zip(self.classes, exps)}
+
+    def predict(self, text: str) -> tuple:
+        probabilities = self.predict_proba(text)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
@@ -1,12 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from typing import Optional
 import sqlite3
 import os
-import pandas as pd
+import glob
+import json
+import threading
+from datetime import date, datetime
 from dotenv import load_dotenv
-import uvicorn
+import time
 
-from ai_service import AIService
+from metrics import REQUEST_LATENCY, DB_ROWS, timed, render_metrics
+from slow_query import SlowQueryLog
+from singleflight import AsyncSingleFlight
 # Load .env variables
 load_dotenv()
 DB_PATH = os.getenv("DB_PATH", "./data/hospital_data.db")
@@ -14,9 +23,99 @@ SQL_DUMP_PATH = os.getenv("SQL_DUMP_PATH", "./data/data_dump.sql")
 DATA_FOLDER = os.getenv("DATA_FOLDER", "./data")
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("BE_PORT", 8000))
-DEBUG = os.getenv("DEBUG", "true").lower() == "true"
-
-app = FastAPI()
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+# Build the AI service in the background right after startup instead of on the first LLM request
+WARMUP_AI_SERVICE = os.getenv("WARMUP_AI_SERVICE", "true").lower() == "true"
+PARQUET_BATCH_SIZE = int(os.getenv("PARQUET_BATCH_SIZE", 50_000))
+# Change feed: rows fetched from SQLite per chunk, and the cap on rows per /changes call
+CHANGE_FEED_BATCH_SIZE = int(os.getenv("CHANGE_FEED_BATCH_SIZE", 1_000))
+CHANGE_FEED_MAX_LIMIT = int(os.getenv("CHANGE_FEED_MAX_LIMIT", 100_000))
+
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service():
+    """
+    AIService is created on first use: importing it loads the OpenAI/Ollama clients, which
+    would otherwise dominate startup time.
+    """
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                from ai_service import AIService
+                _ai_service = AIService()
+    return _ai_service
+
+async def ai_service_async():
+    # The first construction blocks for a while, keep it off the event loop
+    return _ai_service or await run_in_threadpool(get_ai_service)
+
+def _warmup_ai_service():
+    try:
+        get_ai_service()
+    except Exception as e:
+        print(f"AI service warmup error: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_AI_SERVICE:
+        threading.Thread(target=_warmup_ai_service, name="ai-service-warmup", daemon=True).start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+slow_query_log = SlowQueryLog()
+# Concurrent identical read queries / LLM prompts share one in-flight call
+execute_flight = AsyncSingleFlight("execute")
+llm_flight = AsyncSingleFlight("llm_endpoint")
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template rather than raw path to keep metric cardinality bounded
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    REQUEST_LATENCY.labels(request.method, path, response.status_code).observe(time.perf_counter() - start)
+    return response
+
+# Full-text indexes over free-text columns: fts table -> (content table, rowid column, columns)
+FTS_INDEXES = {
+    "encounters_fts": ("encounters", "encounter_id", ["chief_complaint"]),
+    "provider_feedback_fts": ("provider_feedback", "feedback_id", ["comment"]),
+    "audit_logs_fts": ("audit_logs", "log_id", ["details"]),
+    "provider_leaves_fts": ("provider_leaves", "leave_id", ["reason"]),
+}
+_fts_ready = False
+_fts_lock = threading.Lock()
+
+# Change feed watermarks: table -> (timestamp column, primary key). Tables without a
+# timestamp column (diagnosis_codes, shift_types, ...) have no change feed, and tables
+# keyed on an insert-only column (no updated_at) only report new rows.
+CHANGE_FEED_COLUMNS = {
+    "providers": ("updated_at", "provider_id"),
+    "hospitals": ("updated_at", "hospital_id"),
+    "departments": ("updated_at", "department_id"),
+    "sites": ("updated_at", "site_id"),
+    "patients": ("updated_at", "patient_id"),
+    "provider_assignments": ("updated_at", "assignment_id"),
+    "shifts": ("updated_at", "shift_id"),
+    "encounters": ("updated_at", "encounter_id"),
+    "performance_targets": ("updated_at", "target_id"),
+    "provider_metrics": ("updated_at", "metric_id"),
+    "hospital_admins": ("updated_at", "admin_id"),
+    "audit_logs": ("timestamp", "log_id"),
+    "site_departments": ("created_at", "id"),
+    "provider_feedback": ("submitted_at", "feedback_id"),
+    "provider_leaves": ("created_at", "leave_id"),
+    "document_uploads": ("uploaded_at", "doc_id"),
+}
+CHANGE_FEED_INSERT_ONLY = [table for table, (column, _) in CHANGE_FEED_COLUMNS.items() if column != "updated_at"]
+# All timestamps are local time with millisecond precision, "YYYY-MM-DD HH:MM:SS.SSS", so
+# loader-written and trigger-written values compare correctly against a watermark
+TIMESTAMP_NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+_change_feed_ready = False
+_change_feed_lock = threading.Lock()
 
 # ----------- Sample Initialization ------------
 def initialize_sample_db(force_initialize: bool = False):
@@ -230,12 +329,101 @@ def initialize_sample_db(force_initialize: bool = False):
             uploaded_by INTEGER
         );
     ''')
+    create_fts_indexes(cursor)
+    create_change_feed_indexes(cursor)
 
     conn.commit()
     conn.close()
 
     load_data_dump()
 
+def create_fts_indexes(cursor):
+    """
+    Creates FTS5 external-content tables for the free-text columns, with triggers that keep
+    them in sync with inserts, updates and deletes on the content tables.
+    """
+    for fts_table, (table, rowid, columns) in FTS_INDEXES.items():
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        cursor.executescript(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+                USING fts5({cols}, content='{table}', content_rowid='{rowid}');
+
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{rowid}, {new_cols});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old_cols});
+            END;
+            -- Only text edits touch the index; timestamp stamping/touch triggers must not.
+            -- Recreated so older DBs lose the unconditional AFTER UPDATE version.
+            DROP TRIGGER IF EXISTS {table}_fts_au;
+            CREATE TRIGGER {table}_fts_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old_cols});
+                INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{rowid}, {new_cols});
+            END;
+        ''')
+
+def create_change_feed_indexes(cursor):
+    """
+    Indexes (timestamp, pk) for the change feed's keyset scans, and triggers that stamp
+    the feed column on inserts that leave it NULL and bump `updated_at` on updates that
+    do not set it themselves, so new rows and edits show up in the feed.
+    """
+    for table, (column, pk) in CHANGE_FEED_COLUMNS.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column}_changes ON "{table}" ("{column}", {pk})')
+        # Recreated rather than IF NOT EXISTS, so older DBs pick up the current timestamp format
+        cursor.execute(f'DROP TRIGGER IF EXISTS {table}_stamp_{column}')
+        cursor.execute(f'''
+            CREATE TRIGGER {table}_stamp_{column} AFTER INSERT ON "{table}"
+            WHEN new."{column}" IS NULL BEGIN
+                UPDATE "{table}" SET "{column}" = {TIMESTAMP_NOW_SQL} WHERE {pk} = new.{pk};
+            END
+        ''')
+        if column != "updated_at":
+            continue
+        cursor.execute(f'DROP TRIGGER IF EXISTS {table}_touch_updated_at')
+        cursor.execute(f'''
+            CREATE TRIGGER {table}_touch_updated_at AFTER UPDATE ON "{table}"
+            WHEN new.updated_at IS old.updated_at BEGIN
+                UPDATE "{table}" SET updated_at = {TIMESTAMP_NOW_SQL} WHERE {pk} = new.{pk};
+            END
+        ''')
+
+def rebuild_fts_indexes(cursor, tables=None):
+    """
+    Rebuilds the FTS indexes from their content tables. Used after bulk loads, where
+    `INSERT OR REPLACE` skips the delete triggers and one rebuild is cheaper anyway.
+    """
+    for fts_table, (table, _, _) in FTS_INDEXES.items():
+        if tables is None or table in tables:
+            cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+def ensure_fts_indexes():
+    """
+    DBs created before the FTS indexes existed get them on first use, built once from the
+    content tables; the prompts point text search at the *_fts tables.
+    """
+    global _fts_ready
+    if _fts_ready:
+        return
+    with _fts_lock:
+        if _fts_ready:
+            return
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            cursor = conn.cursor()
+            existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            missing = [table for fts_table, (table, _, _) in FTS_INDEXES.items() if fts_table not in existing]
+            create_fts_indexes(cursor)
+            if missing:
+                rebuild_fts_indexes(cursor, tables=missing)
+            conn.commit()
+        finally:
+            conn.close()
+        _fts_ready = True
+
 # ------------- Load SQL Data ------------------
 def load_data_dump():
     if os.path.exists(SQL_DUMP_PATH):
@@ -250,34 +438,96 @@ def load_data_dump():
             except sqlite3.Error as e:
                 print("Error loading data dump:", e)
 
+# ------------- Load Parquet Data ---------------
+def _to_sqlite_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ", timespec="milliseconds") if isinstance(value, datetime) else value.isoformat()
+    return value
+
+def load_parquet_data(data_folder: str = DATA_FOLDER, refresh: bool = False) -> dict:
+    """
+    Populates the DB from `<table>.parquet` files in `data_folder`, reading record batches
+    lazily so large files never have to fit in memory. With `refresh`, existing rows of each
+    loaded table are replaced; otherwise rows are upserted on their primary key.
+    """
+    import pyarrow.parquet as pq
+
+    loaded = {}
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.cursor()
+        for path in sorted(glob.glob(os.path.join(data_folder, "*.parquet"))):
+            table = os.path.splitext(os.path.basename(path))[0]
+            table_columns = [row[1] for row in cursor.execute(f'PRAGMA table_info("{table}")')]
+            if not table_columns:
+                print(f"Skipping {path}: no table named {table}")
+                continue
+
+            parquet_file = pq.ParquetFile(path)
+            columns = [name for name in parquet_file.schema_arrow.names if name in table_columns]
+            placeholders = ", ".join("?" for _ in columns)
+            insert_sql = (f'INSERT OR REPLACE INTO "{table}" ({", ".join(columns)}) '
+                          f'VALUES ({placeholders})')
+
+            if refresh:
+                cursor.execute(f'DELETE FROM "{table}"')
+
+            count = 0
+            for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_SIZE, columns=columns):
+                values = [[_to_sqlite_value(v) for v in batch.column(name).to_pylist()] for name in columns]
+                cursor.executemany(insert_sql, zip(*values))
+                count += batch.num_rows
+            parquet_file.close()
+            loaded[table] = count
+
+        rebuild_fts_indexes(cursor, tables=loaded)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return loaded
+
 # ------------- Request Model ------------------
 class SQLQuery(BaseModel):
     query: str
     force_initialize: bool = False
+    # Conversation session the query was generated for; its result shape is remembered
+    sessionId: Optional[str] = None
+    # Run as a single SELECT on a query_only connection (used for model-generated SQL)
+    readOnly: bool = False
 
 class NL2SQL_data(BaseModel):
     userInput: str
+    sessionId: Optional[str] = None
 
 # ------------- Main Endpoints ------------------
-@app.post("/execute")
-async def execute_sql(sql_query: SQLQuery):
-    initialize_sample_db(force_initialize=sql_query.force_initialize)
-    query = sql_query.query
-
+def run_query(query: str, read_only: bool = False) -> dict:
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
         cursor.execute("BEGIN")
-        result = cursor.execute(query)
 
         if query.strip().lower().startswith("select"):
-            columns = [description[0] for description in result.description]
-            rows = result.fetchall()
+            start = time.perf_counter()
+            with timed("db_execution"):
+                result = cursor.execute(query)
+                columns = [description[0] for description in result.description]
+                rows = result.fetchall()
             conn.commit()
+            slow_query_log.record(conn, query, time.perf_counter() - start, len(rows))
             conn.close()
+            DB_ROWS.observe(len(rows))
             return {"columns": columns, "rows": rows}
         else:
+            start = time.perf_counter()
+            with timed("db_execution"):
+                cursor.execute(query)
             conn.commit()
+            slow_query_log.record(conn, query, time.perf_counter() - start, max(cursor.rowcount, 0))
             conn.close()
             return {"status": "success", "message": "Query executed successfully."}
 
@@ -286,29 +536,164 @@ async def execute_sql(sql_query: SQLQuery):
         conn.close()
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/execute")
+async def execute_sql(sql_query: SQLQuery):
+    initialize_sample_db(force_initialize=sql_query.force_initialize)
+    if not _fts_ready:
+        await run_in_threadpool(ensure_fts_indexes)
+    query = sql_query.query
+    is_select = query.strip().lower().startswith("select")
+    if sql_query.readOnly and not is_select:
+        raise HTTPException(status_code=400, detail="Only a single SELECT statement can run read-only.")
+
+    # Only reads are coalesced; writes always run once per request
+    if is_select:
+        result = await execute_flight.do((query.strip(), sql_query.readOnly), run_in_threadpool,
+                                         run_query, query, sql_query.readOnly)
+    else:
+        result = await run_in_threadpool(run_query, query)
+
+    if "rows" not in result:
+        return result
+    if sql_query.sessionId:
+        ai_service = await ai_service_async()
+        ai_service.conversations.record_result(sql_query.sessionId, query, result["columns"], result["rows"])
+    with timed("serialization"):
+        response = JSONResponse(content=result)
+    return response
+
+def ensure_change_feed_indexes():
+    # DBs created before the change feed existed get their indexes on first use
+    global _change_feed_ready
+    if _change_feed_ready:
+        return
+    # The stamping triggers rely on the FTS update triggers being limited to text columns
+    ensure_fts_indexes()
+    with _change_feed_lock:
+        if _change_feed_ready:
+            return
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            create_change_feed_indexes(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+        _change_feed_ready = True
+
+async def stream_changes(table: str, since: Optional[str], after_id: Optional[int], limit: int):
+    """
+    Yields NDJSON lines: the rows of `table` changed after the (since, after_id) watermark in
+    (timestamp, pk) order, then a trailer with the watermark to resume from. Rows are read
+    in CHANGE_FEED_BATCH_SIZE chunks from a keyset scan over the change feed index.
+    """
+    column, pk = CHANGE_FEED_COLUMNS[table]
+    if since is None:
+        where, params = "", []
+    elif after_id is None:
+        where, params = f'WHERE "{column}" > ?', [since]
+    else:
+        where, params = f'WHERE ("{column}", {pk}) > (?, ?)', [since, after_id]
+    query = f'SELECT * FROM "{table}" {where} ORDER BY "{column}", {pk} LIMIT ?'
+
+    # Each batch runs on whichever threadpool worker is free; the connection is only ever
+    # used by one of them at a time, so the same-thread check can be turned off
+    conn = await run_in_threadpool(sqlite3.connect, DB_PATH, check_same_thread=False)
+    try:
+        cursor = await run_in_threadpool(conn.execute, query, params + [limit])
+        columns = [description[0] for description in cursor.description]
+        watermark = {"since": since, "after_id": after_id}
+        count = 0
+        while True:
+            rows = await run_in_threadpool(cursor.fetchmany, CHANGE_FEED_BATCH_SIZE)
+            if not rows:
+                break
+            count += len(rows)
+            last = dict(zip(columns, rows[-1]))
+            watermark = {"since": last[column], "after_id": last[pk]}
+            yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+        DB_ROWS.observe(count)
+        yield json.dumps({"watermark": watermark, "count": count, "has_more": count == limit}) + "\n"
+    finally:
+        await run_in_threadpool(conn.close)
+
+@app.get("/changes/{table}")
+async def changes(table: str, since: Optional[str] = None, after_id: Optional[int] = None, limit: int = 10_000):
+    """
+    Change feed for mirroring: rows of `table` created or updated after the watermark,
+    streamed as NDJSON. The last line carries the watermark for the next call.
+    Tables in CHANGE_FEED_INSERT_ONLY (audit_logs, provider_feedback, ...) have no
+    updated_at, so only newly inserted rows show up; updates to them are not reported.
+    Deletes are not reported for any table.
+    """
+    if table not in CHANGE_FEED_COLUMNS:
+        available = [f"{name} (insert-only)" if name in CHANGE_FEED_INSERT_ONLY else name
+                     for name in CHANGE_FEED_COLUMNS]
+        raise HTTPException(status_code=400,
+                            detail=f"No change feed for {table}; available: {', '.join(available)}")
+    if not 0 < limit <= CHANGE_FEED_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CHANGE_FEED_MAX_LIMIT}")
+    initialize_sample_db()
+    await run_in_threadpool(ensure_change_feed_indexes)
+    return StreamingResponse(stream_changes(table, since, after_id, limit), media_type="application/x-ndjson")
+
+@app.get("/metrics")
+async def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+@app.get("/slow_queries")
+async def slow_queries(limit: int = 10):
+    return {"threshold_ms": slow_query_log.threshold_ms, "queries": slow_query_log.top(limit)}
+
 @app.post("/initialize")
 async def initialize(force: bool = True):
     initialize_sample_db(force_initialize=force)
     return {"status": "initialized", "forced": force}
 
-ai_service =  AIService()
+@app.post("/load_parquet")
+async def load_parquet(refresh: bool = False):
+    initialize_sample_db()
+    await run_in_threadpool(ensure_fts_indexes)
+    try:
+        loaded = await run_in_threadpool(load_parquet_data, refresh=refresh)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "loaded", "tables": loaded}
+
 @app.post("/NL2SQL")
 async def naturalLanguageToSqlQuery (data: NL2SQL_data):
     try:
-        output = ai_service.generate_sql_query(natural_language_prompt=data.userInput)
+        ai_service = await ai_service_async()
+        output = await llm_flight.do(("sql", data.sessionId, data.userInput), run_in_threadpool,
+                                     ai_service.generate_sql_query, natural_language_prompt=data.userInput,
+                                     session_id=data.sessionId)
         return output
     except Exception as e:
         print("Error: problem in generating data from query!")
         return e
     
+@app.delete("/conversation/{session_id}")
+async def clearConversation(session_id: str):
+    ai_service = await ai_service_async()
+    ai_service.conversations.clear(session_id)
+    return {"status": "cleared", "sessionId": session_id}
+
+@app.get("/sql_backends")
+async def sqlBackends():
+    ai_service = await ai_service_async()
+    return ai_service.sql_backends.status()
+
 @app.post("/intent_classify")
 async def intentClassify (data: NL2SQL_data):
     try:
-        output = ai_service.detect_intent(user_input=data.userInput)
+        ai_service = await ai_service_async()
+        output = await llm_flight.do(("intent", data.userInput), run_in_threadpool,
+                                     ai_service.detect_intent, user_input=data.userInput)
         return output
     except Exception as e:
         return e
 
 # ------------- Main Entry ----------------------
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host=API_HOST, port=API_PORT, reload=DEBUG)
@@ -0,0 +1,84 @@
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Set DEBUG_PRINTS=true to dump raw LLM responses to stdout (off by default, it blocks the worker)
+DEBUG_PRINTS = os.getenv("DEBUG_PRINTS", "false").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_LATENCY = Histogram(
+    "chatbot_stage_duration_seconds",
+    "Time spent in each request stage (intent_llm, table_selection, sql_generation, db_execution, serialization)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_LATENCY = Histogram(
+    "chatbot_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "path", "status"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "chatbot_llm_tokens_total",
+    "Tokens consumed by LLM calls",
+    ["model", "kind"]
+)
+DB_ROWS = Histogram(
+    "chatbot_db_rows_returned",
+    "Rows returned per executed query",
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+)
+CACHE_REQUESTS = Counter(
+    "chatbot_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ["cache", "result"]
+)
+SQL_PROMPT_TOKENS = Histogram(
+    "chatbot_sql_prompt_tokens",
+    "Estimated prompt tokens per SQL generation request",
+    buckets=(100, 200, 400, 600, 800, 1_000, 1_500, 2_000, 4_000, 8_000)
+)
+SQL_BACKEND_OUTSTANDING = Gauge(
+    "chatbot_sql_backend_outstanding",
+    "In-flight SQL generation requests per backend",
+    ["backend"]
+)
+SQL_BACKEND_REQUESTS = Counter(
+    "chatbot_sql_backend_requests_total",
+    "SQL generation requests per backend by result",
+    ["backend", "result"]
+)
+
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+def record_openai_usage(model: str, response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+def record_ollama_usage(model: str, response) -> None:
+    LLM_TOKENS.labels(model, "prompt").inc(response.get("prompt_eval_count") or 0)
+    LLM_TOKENS.labels(model, "completion").inc(response.get("eval_count") or 0)
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def debug_print(*args) -> None:
+    if DEBUG_PRINTS:
+        print(*args)
+
+def render_metrics() -> tuple:
+    """
+    Returns the Prometheus text exposition of all metrics and its content type.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
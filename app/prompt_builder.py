@@ -0,0 +1,181 @@
+import os
+import re
+from constants import SCHEMA_PROMPT, FTS_SEARCH_PROMPT
+
+SQL_SYSTEM_PROMPT = "You are a SQL expert who writes syntactically correct SQL queries for sqlite. Schema:\n"
+# Token budget for the schema section of the SQL generation prompt
+SQL_PROMPT_TOKEN_BUDGET = int(os.getenv("SQL_PROMPT_TOKEN_BUDGET", 600))
+# Audit columns every table carries; dropped unless the question asks about them
+BOILERPLATE_COLUMNS = {"created_at", "updated_at"}
+
+_TABLE_RE = re.compile(r"CREATE\s+(VIRTUAL\s+)?TABLE\s+(\w+)\s*(?:USING\s+fts5)?\s*\((.*?)\);", re.S | re.I)
+_FK_RE = re.compile(r"REFERENCES\s+(\w+)\s*\((\w+)\)", re.I)
+_OPTION_RE = re.compile(r"(\w+)\s*=\s*'(\w+)'")
+_WORD_RE = re.compile(r"[a-z]+")
+
+_TYPE_NAMES = {
+    "serial": "int", "int": "int", "integer": "int", "varchar": "text", "text": "text",
+    "timestamp": "timestamp", "date": "date", "numeric": "num", "real": "num", "boolean": "bool",
+}
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+def count_tokens(text: str) -> int:
+    """
+    Token count via tiktoken when installed, otherwise the usual ~4 characters per token.
+    """
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+def _split_columns(body: str) -> list:
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+def parse_schema(schema_text: str = SCHEMA_PROMPT) -> dict:
+    """
+    Parses CREATE TABLE statements into {table: {"columns": [column dicts], "fts": ...}}.
+    """
+    tables = {}
+    for match in _TABLE_RE.finditer(schema_text):
+        is_virtual, name, body = match.group(1), match.group(2), match.group(3)
+        if is_virtual:
+            options = dict(_OPTION_RE.findall(body))
+            columns = [c for c in _split_columns(body) if "=" not in c]
+            tables[name] = {"columns": [], "fts": {"columns": columns, "content": options.get("content"),
+                                                   "rowid": options.get("content_rowid")}}
+            continue
+
+        columns = []
+        for definition in _split_columns(body):
+            tokens = definition.split()
+            if len(tokens) < 2 or tokens[0].upper() in ("PRIMARY", "FOREIGN", "UNIQUE", "CONSTRAINT"):
+                continue
+            base_type = re.split(r"[(\s]", tokens[1].lower())[0]
+            fk = _FK_RE.search(definition)
+            columns.append({
+                "name": tokens[0],
+                "type": _TYPE_NAMES.get(base_type, base_type),
+                "pk": "PRIMARY KEY" in definition.upper(),
+                "fk": f"{fk.group(1)}.{fk.group(2)}" if fk else None,
+            })
+        tables[name] = {"columns": columns, "fts": None}
+    return tables
+
+SCHEMA = parse_schema()
+
+def render_table(name: str, table: dict, columns: list = None) -> str:
+    if table["fts"]:
+        fts = table["fts"]
+        return f"{name}(fts5 over {fts['content']}: {', '.join(fts['columns'])}; rowid={fts['content']}.{fts['rowid']})"
+
+    rendered = []
+    for column in table["columns"] if columns is None else columns:
+        text = f"{column['name']} {column['type']}"
+        if column["pk"]:
+            text += " pk"
+        if column["fk"]:
+            text += f" -> {column['fk']}"
+        rendered.append(text)
+    return f"{name}({', '.join(rendered)})"
+
+def render_schema(tables: dict = None) -> str:
+    """
+    Compact one-line-per-table rendering of the whole schema, boilerplate columns removed.
+    """
+    tables = SCHEMA if tables is None else tables
+    return "\n".join(
+        render_table(name, table, [c for c in table["columns"] if c["name"] not in BOILERPLATE_COLUMNS])
+        for name, table in tables.items()
+    )
+
+COMPACT_SCHEMA_PROMPT = render_schema()
+
+def _question_words(question: str) -> set:
+    return {word[:5] for word in _WORD_RE.findall(question.lower()) if len(word) > 2}
+
+def _column_relevance(column: dict, words: set, join_keys: set) -> float:
+    # Keys are never pruned: declared ones, and undeclared ones named after a selected
+    # table's primary key (e.g. encounters.patient_id when patients is selected)
+    if column["pk"] or column["fk"] or column["name"] in join_keys:
+        return 10.0
+    parts = {part[:5] for part in column["name"].lower().split("_") if len(part) > 2}
+    relevance = float(len(parts & words))
+    # Other id-like columns (audit_logs.entity_id, document_uploads.uploaded_by) may still be
+    # join paths, so they go after ordinary columns
+    if column["name"].endswith(("_id", "_by")):
+        relevance += 5.0
+    return min(relevance, 9.0)
+
+def build_sql_prompt(question: str, selections: list, token_budget: int = SQL_PROMPT_TOKEN_BUDGET) -> tuple:
+    """
+    Builds the SQL generation system prompt from the selected tables, rendering a compact
+    schema and pruning the least relevant non-key columns until it fits `token_budget`.
+    Returns the prompt and a stats dict with token counts.
+    """
+    words = _question_words(question)
+    keep_boilerplate = bool(words & {"creat", "updat", "recen", "modif", "chang"})
+
+    selected = {}
+    for selection in selections:
+        name = selection.get("table")
+        table = SCHEMA.get(name)
+        if table is None and selection.get("schema"):
+            table = parse_schema(selection["schema"]).get(name)
+        if table is None:
+            continue
+        columns = [c for c in table["columns"] if keep_boilerplate or c["name"] not in BOILERPLATE_COLUMNS]
+        selected[name] = (table, columns)
+
+    # Text-search questions need the FTS table next to its content table
+    for name, table in SCHEMA.items():
+        if table["fts"] and table["fts"]["content"] in selected and name not in selected:
+            selected[name] = (table, [])
+
+    join_keys = {column["name"] for table, _ in selected.values() for column in table["columns"] if column["pk"]}
+
+    def render() -> str:
+        return "\n".join(render_table(name, table, columns) for name, (table, columns) in selected.items())
+
+    schema_text = render()
+    pruned = []
+    while count_tokens(schema_text) > token_budget:
+        candidates = [
+            (_column_relevance(column, words, join_keys), name, column)
+            for name, (_, columns) in selected.items()
+            for column in columns
+            if _column_relevance(column, words, join_keys) < 10.0
+        ]
+        if not candidates:
+            break
+        _, name, column = min(candidates, key=lambda c: c[0])
+        selected[name][1].remove(column)
+        pruned.append(f"{name}.{column['name']}")
+        schema_text = render()
+
+    prompt = SQL_SYSTEM_PROMPT + schema_text
+    if any(table["fts"] for table, _ in selected.values()):
+        prompt += FTS_SEARCH_PROMPT
+
+    stats = {
+        "tables": list(selected),
+        "schema_tokens": count_tokens(schema_text),
+        "prompt_tokens": count_tokens(prompt) + count_tokens(question),
+        "pruned_columns": pruned,
+    }
+    return prompt, stats
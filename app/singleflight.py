@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from metrics import record_cache
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls from threads: the first caller for a key runs
+    the function and every caller that arrives while it is in flight waits for, and
+    receives, that same result (or exception). Nothing is cached once the call returns.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        record_cache(f"singleflight_{self.name}", not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class AsyncSingleFlight:
+    """
+    Event-loop counterpart of SingleFlight: concurrent requests for the same key await
+    one shared future instead of each occupying a worker thread.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._futures = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._futures.get(key)
+        record_cache(f"singleflight_{self.name}", future is not None)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._futures[key] = future
+            future.add_done_callback(lambda f: self._futures.pop(key) if self._futures.get(key) is f else None)
+        # shield() so one client disconnecting does not cancel the call for the others
+        return await asyncio.shield(future)
@@ -0,0 +1,117 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import deque
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", 500))
+# Optional persistent sink: a `.jsonl` file, or any other path is used as a SQLite DB
+SLOW_QUERY_SINK = os.getenv("SLOW_QUERY_SINK", "")
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalizes a query so that runs differing only in literals group together, e.g.
+    `SELECT * FROM encounters WHERE provider_id = 12` -> `select * from encounters where provider_id = ?`.
+    """
+    sql = _COMMENT_RE.sub(" ", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?)", sql)
+    return _SPACE_RE.sub(" ", sql).strip().rstrip(";").lower()
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 buffer_size: int = SLOW_QUERY_BUFFER_SIZE, sink_path: str = SLOW_QUERY_SINK):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=buffer_size)
+        self.sink_path = sink_path
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql: str, duration_s: float, rows: int) -> None:
+        """
+        Records `sql` if it ran longer than the threshold, capturing its query plan from
+        the still-open connection that executed it.
+        """
+        duration_ms = duration_s * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "timestamp": time.time(),
+            "sql": sql,
+            "fingerprint": fingerprint(sql),
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "plan": self._explain(conn, sql)
+        }
+        with self._lock:
+            self.entries.append(entry)
+            if self.sink_path:
+                self._write_sink(entry)
+
+    def top(self, limit: int = 10) -> list:
+        """
+        Returns the `limit` slowest query fingerprints in the buffer, ranked by total time.
+        """
+        with self._lock:
+            entries = list(self.entries)
+
+        groups = {}
+        for entry in entries:
+            group = groups.setdefault(entry["fingerprint"], {
+                "fingerprint": entry["fingerprint"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "total_rows": 0
+            })
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["total_rows"] += entry["rows"]
+            group["sample_sql"] = entry["sql"]
+            group["plan"] = entry["plan"]
+
+        ranked = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]
+        for group in ranked:
+            group["total_ms"] = round(group["total_ms"], 3)
+            group["mean_ms"] = round(group["total_ms"] / group["count"], 3)
+        return ranked
+
+    def _explain(self, conn, sql: str) -> list:
+        try:
+            return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+        except sqlite3.Error:
+            return []
+
+    def _write_sink(self, entry: dict) -> None:
+        try:
+            if self.sink_path.endswith(".jsonl"):
+                with open(self.sink_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+                return
+
+            sink = sqlite3.connect(self.sink_path)
+            sink.execute('''
+                CREATE TABLE IF NOT EXISTS slow_queries (
+                    timestamp REAL, fingerprint TEXT, sql TEXT, duration_ms REAL, rows INTEGER, plan TEXT
+                )
+            ''')
+            sink.execute(
+                "INSERT INTO slow_queries VALUES (?, ?, ?, ?, ?, ?)",
+                (entry["timestamp"], entry["fingerprint"], entry["sql"], entry["duration_ms"],
+                 entry["rows"], json.dumps(entry["plan"]))
+            )
+            sink.commit()
+            sink.close()
+        except (OSError, sqlite3.Error) as e:
+            print("Error writing slow query sink:", e)
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import threading
+import ollama
+from openai import OpenAI
+from metrics import record_openai_usage, record_ollama_usage, SQL_BACKEND_OUTSTANDING, SQL_BACKEND_REQUESTS
+
+DEFAULT_SQL_MODEL = "pxlksr/defog_sqlcoder-7b-2:F16"
+
+# JSON lists of backends, e.g.
+# [{"name": "gpu-1", "kind": "ollama", "host": "http://10.0.0.5:11434", "model": "pxlksr/defog_sqlcoder-7b-2:F16"},
+#  {"name": "vllm", "kind": "openai", "base_url": "http://10.0.0.6:8000/v1", "model": "sqlcoder", "api_key_env": "VLLM_KEY"}]
+SQL_BACKENDS = os.getenv("SQL_BACKENDS", "")
+# Cheaper backends used once every primary backend has SQL_FALLBACK_QUEUE_DEPTH requests outstanding
+SQL_FALLBACK_BACKENDS = os.getenv("SQL_FALLBACK_BACKENDS", "")
+SQL_FALLBACK_QUEUE_DEPTH = int(os.getenv("SQL_FALLBACK_QUEUE_DEPTH", 4))
+SQL_BACKEND_FAILURE_THRESHOLD = int(os.getenv("SQL_BACKEND_FAILURE_THRESHOLD", 3))
+SQL_BACKEND_COOLDOWN_S = float(os.getenv("SQL_BACKEND_COOLDOWN_S", 30))
+SQL_BACKEND_HEALTH_INTERVAL_S = float(os.getenv("SQL_BACKEND_HEALTH_INTERVAL_S", 15))
+
+class SQLBackend:
+    """
+    One SQL-generation server: an Ollama host or an OpenAI-compatible endpoint, with its
+    own outstanding-request count and circuit breaker.
+    """
+    def __init__(self, kind: str = "ollama", model: str = DEFAULT_SQL_MODEL, name: str = None,
+                 host: str = None, base_url: str = None, api_key_env: str = "OPENAI_API_KEY"):
+        if kind not in ("ollama", "openai"):
+            raise ValueError(f"Unsupported SQL backend kind: {kind}")
+        self.kind = kind
+        self.model = model
+        self.host = host
+        self.base_url = base_url
+        self.api_key_env = api_key_env
+        self.name = name or f"{kind}:{host or base_url or 'default'}/{model}"
+        self.outstanding = 0
+        self.failures = 0
+        self.open_until = 0.0
+        self.healthy = True
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            if self.kind == "ollama":
+                self._client = ollama.Client(host=self.host)
+            else:
+                self._client = OpenAI(api_key=os.getenv(self.api_key_env), base_url=self.base_url)
+        return self._client
+
+    def available(self, now: float) -> bool:
+        # An open circuit lets traffic through again (half-open) once the cooldown passes
+        return self.healthy and now >= self.open_until
+
+    def chat(self, messages: list) -> str:
+        if self.kind == "ollama":
+            response = self.client.chat(model=self.model, messages=messages)
+            record_ollama_usage(self.model, response)
+            return response['message']['content']
+
+        response = self.client.chat.completions.create(model=self.model, messages=messages, temperature=0)
+        record_openai_usage(self.model, response)
+        return response.choices[0].message.content
+
+    def check_health(self) -> bool:
+        try:
+            if self.kind == "ollama":
+                self.client.list()
+            else:
+                self.client.models.list()
+            self.healthy = True
+        except Exception as e:
+            print(f"SQL backend {self.name} failed health check: {e}")
+            self.healthy = False
+        return self.healthy
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "model": self.model,
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "circuit_open": time.monotonic() < self.open_until,
+            "consecutive_failures": self.failures
+        }
+
+class SQLBackendPool:
+    """
+    Routes each SQL-generation request to the available backend with the fewest
+    outstanding requests, falling back to the cheaper tier when the primaries are
+    saturated and retrying on the next backend when one fails.
+    """
+    def __init__(self, backends: list, fallbacks: list = None, fallback_queue_depth: int = SQL_FALLBACK_QUEUE_DEPTH,
+                 health_interval: float = SQL_BACKEND_HEALTH_INTERVAL_S):
+        if not backends:
+            raise ValueError("At least one SQL backend is required")
+        self.backends = backends
+        self.fallbacks = fallbacks or []
+        self.fallback_queue_depth = fallback_queue_depth
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._health_thread = None
+
+    @classmethod
+    def from_env(cls):
+        backends = [SQLBackend(**spec) for spec in json.loads(SQL_BACKENDS)] if SQL_BACKENDS else \
+            [SQLBackend(kind="ollama", model=DEFAULT_SQL_MODEL, host=os.getenv("OLLAMA_HOST"))]
+        fallbacks = [SQLBackend(**spec) for spec in json.loads(SQL_FALLBACK_BACKENDS)] if SQL_FALLBACK_BACKENDS else []
+        return cls(backends, fallbacks)
+
+    def _candidates(self) -> list:
+        """
+        Backends to try, best first: primaries by outstanding count, or fallbacks first
+        when every primary is at the queue-depth limit.
+        """
+        now = time.monotonic()
+        primaries = sorted((b for b in self.backends if b.available(now)), key=lambda b: b.outstanding)
+        fallbacks = sorted((b for b in self.fallbacks if b.available(now)), key=lambda b: b.outstanding)
+        if fallbacks and (not primaries or primaries[0].outstanding >= self.fallback_queue_depth):
+            return fallbacks + primaries
+        if primaries:
+            return primaries + fallbacks
+        # Everything is tripped: try the backend whose circuit reopens first rather than failing outright
+        return sorted(self.backends + self.fallbacks, key=lambda b: b.open_until)[:1]
+
+    def _acquire(self, tried: set):
+        with self._lock:
+            for backend in self._candidates():
+                if backend.name not in tried:
+                    backend.outstanding += 1
+                    SQL_BACKEND_OUTSTANDING.labels(backend.name).inc()
+                    return backend
+        return None
+
+    def _release(self, backend: SQLBackend, ok: bool) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            SQL_BACKEND_OUTSTANDING.labels(backend.name).dec()
+            if ok:
+                backend.failures = 0
+                backend.open_until = 0.0
+            else:
+                backend.failures += 1
+                if backend.failures >= SQL_BACKEND_FAILURE_THRESHOLD:
+                    backend.open_until = time.monotonic() + SQL_BACKEND_COOLDOWN_S
+        SQL_BACKEND_REQUESTS.labels(backend.name, "success" if ok else "failure").inc()
+
+    def generate(self, messages: list) -> str:
+        self._ensure_health_checks()
+        tried, last_error = set(), None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise last_error or RuntimeError("No SQL backend available")
+            tried.add(backend.name)
+            try:
+                content = backend.chat(messages)
+            except Exception as e:
+                self._release(backend, ok=False)
+                print(f"SQL backend {backend.name} failed: {e}")
+                last_error = e
+                continue
+            self._release(backend, ok=True)
+            return content
+
+    def check_health(self) -> None:
+        for backend in self.backends + self.fallbacks:
+            backend.check_health()
+
+    def _ensure_health_checks(self) -> None:
+        if self.health_interval <= 0 or self._health_thread is not None:
+            return
+        with self._lock:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+                self._health_thread.start()
+
+    def _health_loop(self) -> None:
+        while True:
+            self.check_health()
+            time.sleep(self.health_interval)
+
+    def status(self) -> dict:
+        return {
+            "backends": [b.status() for b in self.backends],
+            "fallbacks": [b.status() for b in self.fallbacks],
+            "fallback_queue_depth": self.fallback_queue_depth
+        }
@@ -0,0 +1,114 @@
+import ast
+import json
+from typing import List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+
+class StructuredOutputError(ValueError):
+    pass
+
+# ------------- Schemas ------------------
+class IntentFlags(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    AUDIO_GENERATION: bool = False
+    SQL_QUERY: List[Union[bool, str]] = [False, ""]
+    DATA_GENERATION: Optional[str] = ""
+    GRAPHIC_GENERATIONS: Optional[str] = ""
+
+    @field_validator("SQL_QUERY", mode="before")
+    @classmethod
+    def _normalize_sql_query(cls, value):
+        # Models sometimes answer `true` or `[true]` instead of `[true, "..."]`
+        if isinstance(value, bool):
+            return [value, ""]
+        if isinstance(value, (list, tuple)):
+            flag = bool(value[0]) if value else False
+            sql = value[1] if len(value) > 1 and value[1] is not None else ""
+            return [flag, str(sql)]
+        return value
+
+class IntentResult(BaseModel):
+    intent: IntentFlags = Field(default_factory=IntentFlags)
+
+class TableSchema(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    table: str
+    table_schema: str = Field(default="", alias="schema")
+
+class TableSelection(BaseModel):
+    tables: List[TableSchema] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_bare_list(cls, data):
+        return {"tables": data} if isinstance(data, list) else data
+
+# ------------- JSON extraction ------------------
+class JSONStreamExtractor:
+    """
+    Incrementally scans text (e.g. streamed completion chunks) and yields each complete
+    top-level JSON object or array as soon as its closing bracket arrives, skipping any
+    prose or markdown fences around it.
+    """
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[str]:
+        completed = []
+        for char in chunk:
+            if self._depth == 0:
+                if char in "{[":
+                    self._buffer = [char]
+                    self._depth = 1
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append("".join(self._buffer))
+                    self._buffer = []
+        return completed
+
+def extract_json(text: str):
+    """
+    Returns the first JSON value found in `text`. Falls back to `ast.literal_eval` for
+    Python-style literals (True/None, single quotes), never to `eval`.
+    """
+    if text is None:
+        raise StructuredOutputError("Empty model response")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    for candidate in JSONStreamExtractor().feed(text):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            try:
+                return ast.literal_eval(candidate)
+            except (ValueError, SyntaxError):
+                continue
+    raise StructuredOutputError(f"No JSON value found in model response: {text[:200]!r}")
+
+def parse_model(text: str, model_cls: type) -> BaseModel:
+    try:
+        return model_cls.model_validate(extract_json(text))
+    except ValidationError as e:
+        raise StructuredOutputError(str(e)) from e
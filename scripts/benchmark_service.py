@@ -0,0 +1,190 @@
+"""
+Offline throughput/latency benchmark for the FastAPI service.
+
+Starts the app in-process with the mock LLM backends from `mock_llm.py`, replays a
+workload against /execute, /NL2SQL, /intent_classify and the orchestrator at a given
+concurrency, and reports p50/p95/p99 latency, throughput and memory per endpoint.
+
+    python scripts/benchmark_service.py --requests 200 --concurrency 16 --output bench.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import asyncio
+import argparse
+import resource
+import tempfile
+import threading
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "app")
+
+DEFAULT_QUESTIONS = [
+    "How many encounters did each department have last month?",
+    "List the top 5 providers by number of encounters",
+    "Which hospitals have the most ICU departments?",
+    "Show encounters mentioning chest pain",
+    "What is the average provider rating per specialty?",
+]
+
+DEFAULT_QUERIES = [
+    "SELECT COUNT(*) FROM encounters",
+    "SELECT d.name, COUNT(*) FROM encounters e JOIN departments d ON d.department_id = e.department_id GROUP BY d.name",
+    "SELECT provider_id, COUNT(*) AS n FROM encounters GROUP BY provider_id ORDER BY n DESC LIMIT 10",
+]
+
+ENDPOINTS = ["/execute", "/NL2SQL", "/intent_classify", "orchestrator"]
+
+def load_workload(path: str = None) -> dict:
+    """
+    Reads a JSONL workload. Lines with an "endpoint" go to that endpoint only; otherwise
+    "query" lines feed /execute and "userInput"/"question"/"title"/"body" feed the LLM paths.
+    """
+    questions, queries = [], []
+    pinned = {endpoint: [] for endpoint in ENDPOINTS}
+    with open(path) if path else open(os.devnull) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            text = item.get("query") or next(
+                (item[k] for k in ("userInput", "question", "title", "body") if item.get(k)), None)
+            if text is None:
+                continue
+            if item.get("endpoint") in pinned:
+                pinned[item["endpoint"]].append(text)
+            elif "query" in item:
+                queries.append(text)
+            else:
+                questions.append(text)
+
+    return {
+        "/execute": pinned["/execute"] or queries or DEFAULT_QUERIES,
+        "/NL2SQL": pinned["/NL2SQL"] or questions or DEFAULT_QUESTIONS,
+        "/intent_classify": pinned["/intent_classify"] or questions or DEFAULT_QUESTIONS,
+        "orchestrator": pinned["orchestrator"] or questions or DEFAULT_QUESTIONS,
+    }
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int):
+    import uvicorn
+    import main
+
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+async def run_endpoint(endpoint: str, items: list, total: int, concurrency: int, base_url: str) -> dict:
+    import httpx
+    import main
+
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    rss_before = current_rss_mb()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(i: int):
+            nonlocal errors
+            text = items[i % len(items)]
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    if endpoint == "orchestrator":
+                        await asyncio.to_thread(main.get_ai_service().orchestrator, text)
+                    else:
+                        payload = {"query": text} if endpoint == "/execute" else {"userInput": text}
+                        response = await client.post(endpoint, json=payload)
+                        if response.status_code >= 400:
+                            errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "rss_mb": round(current_rss_mb(), 1),
+        "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot service with mock LLM backends.")
+    parser.add_argument("--workload", help="JSONL workload file (defaults to built-in questions/queries)")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--openai-latency", type=float, default=0.05, help="Mock OpenAI latency in seconds")
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="Mock Ollama latency in seconds")
+    parser.add_argument("--db-path", help="SQLite DB to query (defaults to a fresh empty schema)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    import mock_llm
+    mock_llm.install(openai_latency=args.openai_latency, ollama_latency=args.ollama_latency)
+
+    os.environ["DB_PATH"] = args.db_path or os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("SQL_DUMP_PATH", os.path.join(tempfile.gettempdir(), "no_dump.sql"))
+    sys.path.insert(0, APP_DIR)
+
+    import main
+    main.initialize_sample_db()
+    workload = load_workload(args.workload)
+
+    port = free_port()
+    server, thread = start_server(port)
+    results = {}
+    try:
+        for endpoint in args.endpoints:
+            results[endpoint] = asyncio.run(run_endpoint(
+                endpoint, workload[endpoint], args.requests, args.concurrency, f"http://127.0.0.1:{port}"))
+            r = results[endpoint]
+            print(f"{endpoint:<18} {r['throughput_rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.1f} ms  "
+                  f"p95 {r['p95_ms']:>8.1f} ms  p99 {r['p99_ms']:>8.1f} ms  "
+                  f"rss {r['rss_mb']:>7.1f} MB  errors {r['errors']}")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main_cli()
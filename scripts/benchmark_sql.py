@@ -0,0 +1,208 @@
+"""
+SQL workload benchmark for the /execute path over scaled datasets.
+
+For each scale (number of encounter rows) it generates Parquet data with
+HealthcareDataGenerator, loads it into a fresh SQLite DB through the app's own
+initializer and Parquet loader, then runs a fixed catalog of analytic queries and
+records query time, result size and JSON serialization time. Results are written as
+JSON with stable key order so runs can be diffed.
+
+    python scripts/benchmark_sql.py --scales 10000 1000000 10000000 --output sql_bench.json
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import statistics
+import importlib.util
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "app")
+
+QUERY_CATALOG = {
+    "encounters_by_department": '''
+        SELECT h.name AS hospital, d.name AS department, COUNT(*) AS encounters
+        FROM encounters e
+        JOIN departments d ON d.department_id = e.department_id
+        JOIN hospitals h ON h.hospital_id = d.hospital_id
+        GROUP BY h.name, d.name
+        ORDER BY encounters DESC
+        LIMIT 50
+    ''',
+    "top_providers": '''
+        SELECT p.provider_id, p.first_name, p.last_name, COUNT(*) AS encounters
+        FROM encounters e
+        JOIN providers p ON p.provider_id = e.provider_id
+        GROUP BY p.provider_id
+        ORDER BY encounters DESC
+        LIMIT 10
+    ''',
+    "monthly_encounters": '''
+        SELECT strftime('%Y-%m', encounter_date) AS month, COUNT(*) AS encounters
+        FROM encounters
+        GROUP BY month
+        ORDER BY month
+    ''',
+    "weekday_hour_heatmap": '''
+        SELECT strftime('%w', encounter_date) AS weekday, strftime('%H', encounter_date) AS hour,
+               COUNT(*) AS encounters
+        FROM encounters
+        GROUP BY weekday, hour
+    ''',
+    "top_diagnoses": '''
+        SELECT e.diagnosis_code, dc.description, COUNT(*) AS encounters
+        FROM encounters e
+        JOIN diagnosis_codes dc ON dc.code = e.diagnosis_code
+        GROUP BY e.diagnosis_code
+        ORDER BY encounters DESC
+        LIMIT 10
+    ''',
+    "department_disposition_mix": '''
+        SELECT d.name, e.discharge_disposition, COUNT(*) AS encounters
+        FROM encounters e
+        JOIN departments d ON d.department_id = e.department_id
+        GROUP BY d.name, e.discharge_disposition
+    ''',
+    "provider_ratings": '''
+        SELECT p.specialty, AVG(f.rating) AS avg_rating, COUNT(*) AS reviews
+        FROM provider_feedback f
+        JOIN encounters e ON e.encounter_id = f.encounter_id
+        JOIN providers p ON p.provider_id = e.provider_id
+        GROUP BY p.specialty
+        HAVING reviews >= 3
+        ORDER BY avg_rating DESC
+        LIMIT 20
+    ''',
+    "complaint_text_search": '''
+        SELECT e.encounter_id, e.encounter_date, e.chief_complaint
+        FROM encounters e
+        JOIN encounters_fts f ON f.rowid = e.encounter_id
+        WHERE encounters_fts MATCH 'pain OR chest OR fever'
+        LIMIT 1000
+    ''',
+    "recent_encounters_export": '''
+        SELECT * FROM encounters ORDER BY encounter_date DESC LIMIT 100000
+    ''',
+}
+
+def load_generator_class():
+    spec = importlib.util.spec_from_file_location(
+        "data_generation", os.path.join(SCRIPTS_DIR, "data-generation.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.HealthcareDataGenerator
+
+def run_query(db_path: str, sql: str, repeat: int) -> dict:
+    from fastapi.responses import JSONResponse
+
+    query_times, serialization_times = [], []
+    rows, columns, body = [], [], b""
+    for _ in range(repeat):
+        conn = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        cursor = conn.execute(sql)
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+        query_times.append(time.perf_counter() - start)
+        conn.close()
+
+        # Same serialization the /execute endpoint performs
+        start = time.perf_counter()
+        body = JSONResponse(content={"columns": columns, "rows": rows}).body
+        serialization_times.append(time.perf_counter() - start)
+
+    return {
+        "rows": len(rows),
+        "columns": len(columns),
+        "response_bytes": len(body),
+        "query_ms_min": round(min(query_times) * 1000, 3),
+        "query_ms_median": round(statistics.median(query_times) * 1000, 3),
+        "serialization_ms_median": round(statistics.median(serialization_times) * 1000, 3),
+    }
+
+def benchmark_scale(scale: int, args, generator_class, main) -> dict:
+    data_dir = os.path.join(args.work_dir, f"encounters_{scale}")
+    result = {}
+
+    if not os.path.exists(os.path.join(data_dir, "encounters.parquet")):
+        start = time.perf_counter()
+        generator_class(
+            output_dir=data_dir,
+            num_records=args.dimension_records,
+            num_encounters=scale,
+            output_format="parquet",
+            profile=args.profile,
+            seed=args.seed
+        ).generate_and_save_all()
+        result["generate_s"] = round(time.perf_counter() - start, 2)
+
+    db_path = os.path.join(data_dir, "benchmark.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    main.DB_PATH = db_path
+    start = time.perf_counter()
+    main.initialize_sample_db(force_initialize=True)
+    main.load_parquet_data(data_folder=data_dir)
+    result["load_s"] = round(time.perf_counter() - start, 2)
+    result["db_size_mb"] = round(os.path.getsize(db_path) / 2**20, 1)
+
+    result["queries"] = {}
+    for name, sql in QUERY_CATALOG.items():
+        if args.queries and name not in args.queries:
+            continue
+        result["queries"][name] = run_query(db_path, sql, args.repeat)
+        q = result["queries"][name]
+        print(f"  {name:<28} {q['query_ms_median']:>10.2f} ms  rows {q['rows']:>7}  "
+              f"serialize {q['serialization_ms_median']:>8.2f} ms")
+    return result
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the SQL workload over scaled datasets.")
+    parser.add_argument("--scales", nargs="+", type=int, default=[10_000, 1_000_000, 10_000_000],
+                        help="Encounter row counts to benchmark")
+    parser.add_argument("--dimension-records", type=int, default=1000,
+                        help="Rows for providers, departments and the other non-encounter tables")
+    parser.add_argument("--profile", default="realistic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--queries", nargs="+", choices=sorted(QUERY_CATALOG), help="Subset of the catalog")
+    parser.add_argument("--work-dir", default="./bench_data", help="Generated data is cached here between runs")
+    parser.add_argument("--output", default="sql_benchmark.json")
+    args = parser.parse_args()
+
+    # The LLM clients are never called here; the mocks just let `main` import without credentials
+    sys.path.insert(0, SCRIPTS_DIR)
+    import mock_llm
+    mock_llm.install()
+
+    os.environ.setdefault("SQL_DUMP_PATH", os.path.join(args.work_dir, "no_dump.sql"))
+    sys.path.insert(0, APP_DIR)
+    import main
+
+    generator_class = load_generator_class()
+    results = {}
+    for scale in args.scales:
+        print(f"encounters={scale}")
+        results[str(scale)] = benchmark_scale(scale, args, generator_class, main)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "dimension_records": args.dimension_records,
+            "profile": args.profile,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,138 @@
+"""
+Cold-start benchmark for the backend and frontend.
+
+Each run starts a fresh Python process and measures:
+  - import_ms:       `import main` (and `import frontend` when gradio is installed)
+  - ready_ms:        process spawn until uvicorn answers GET /metrics
+  - first_nl2sql_ms: the first /NL2SQL request after ready, which pays for any AI service
+                     initialisation that has not finished yet
+
+The LLM clients are replaced by `mock_llm.py`, so no credentials or model server are needed.
+
+    python scripts/benchmark_startup.py --runs 5 --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import statistics
+import urllib.error
+import urllib.request
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "app")
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path[:0] = [{scripts!r}, {app!r}]
+import mock_llm
+mock_llm.install(openai_latency=0, ollama_latency=0)
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+SERVER_SNIPPET = """
+import sys
+sys.path[:0] = [{scripts!r}, {app!r}]
+import mock_llm
+mock_llm.install(openai_latency=0, ollama_latency=0)
+import uvicorn
+uvicorn.run("main:app", host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def child_env(work_dir: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DB_PATH", os.path.join(work_dir, "startup.db"))
+    env.setdefault("SQL_DUMP_PATH", os.path.join(work_dir, "no_dump.sql"))
+    env.setdefault("DEBUG", "false")
+    return env
+
+def measure_import(module: str, env: dict) -> float:
+    code = IMPORT_SNIPPET.format(scripts=SCRIPTS_DIR, app=APP_DIR, module=module)
+    output = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def post_json(url: str, payload: dict, timeout: float) -> int:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+def measure_server(env: dict, timeout: float) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    code = SERVER_SNIPPET.format(scripts=SCRIPTS_DIR, app=APP_DIR, port=port)
+
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=APP_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError("server did not become ready")
+            try:
+                with urllib.request.urlopen(f"{base_url}/metrics", timeout=1):
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        ready = time.perf_counter()
+
+        post_json(f"{base_url}/NL2SQL", {"userInput": "How many encounters per department?"}, timeout)
+        first_request = time.perf_counter()
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {"ready_ms": (ready - start) * 1000, "first_nl2sql_ms": (first_request - ready) * 1000}
+
+def summarize(values: list) -> dict:
+    return {"median_ms": round(statistics.median(values), 1), "max_ms": round(max(values), 1)}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the backend and frontend.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for readiness")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    env = child_env(tempfile.mkdtemp())
+    samples = {"import_main": [], "ready": [], "first_nl2sql": []}
+    try:
+        import gradio  # noqa: F401
+        samples["import_frontend"] = []
+    except ImportError:
+        print("gradio not installed, skipping frontend import")
+
+    for run in range(args.runs):
+        samples["import_main"].append(measure_import("main", env))
+        if "import_frontend" in samples:
+            samples["import_frontend"].append(measure_import("frontend", env))
+        server = measure_server(env, args.timeout)
+        samples["ready"].append(server["ready_ms"])
+        samples["first_nl2sql"].append(server["first_nl2sql_ms"])
+        print(f"run {run + 1}/{args.runs}: ready {server['ready_ms']:.0f} ms, "
+              f"first /NL2SQL {server['first_nl2sql_ms']:.0f} ms")
+
+    results = {name: summarize(values) for name, values in samples.items()}
+    for name, summary in results.items():
+        print(f"{name:<16} median {summary['median_ms']:>8.1f} ms  max {summary['max_ms']:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main_cli()
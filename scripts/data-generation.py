@@ -1,17 +1,88 @@
 import os
+import argparse
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from faker import Faker
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+
+# Generation profiles. `fk_skew` is the Zipf exponent used when picking foreign keys
+# (0 = uniform), and a date range switches timestamps from `datetime.now()` to events
+# spread over that range, optionally following daily/weekly/yearly cycles.
+GENERATION_PROFILES = {
+    "uniform": {"fk_skew": 0.0, "start_date": None, "end_date": None, "seasonality": False},
+    "realistic": {"fk_skew": 1.1, "start_date": "2024-01-01", "end_date": "2024-12-31", "seasonality": True},
+}
+
+# Relative encounter volume per hour of day, weekday (Mon-Sun) and month (Jan-Dec).
+HOURLY_WEIGHTS = [0.3, 0.25, 0.2, 0.2, 0.2, 0.3, 0.5, 0.8, 1.1, 1.4, 1.6, 1.6,
+                  1.5, 1.4, 1.4, 1.3, 1.3, 1.4, 1.5, 1.4, 1.2, 0.9, 0.6, 0.4]
+WEEKDAY_WEIGHTS = [1.25, 1.1, 1.05, 1.0, 1.05, 0.8, 0.75]
+MONTHLY_WEIGHTS = [1.2, 1.15, 1.05, 1.0, 0.95, 0.9, 0.9, 0.9, 0.95, 1.0, 1.05, 1.15]
+
+# Chief complaints in rough order of ED frequency (picked with the FK skew), so free-text
+# search has realistic terms to match instead of lorem ipsum
+CHIEF_COMPLAINTS = [
+    "Abdominal pain", "Chest pain", "Fever", "Shortness of breath", "Cough", "Headache",
+    "Back pain", "Nausea and vomiting", "Dizziness", "Fall", "Laceration", "Sore throat",
+    "Urinary pain", "Rash", "Palpitations", "Syncope", "Weakness", "Allergic reaction",
+    "Anxiety", "Suspected fracture",
+]
+COMPLAINT_ONSETS = ["", "since this morning", "for 2 days", "for a week", "worsening overnight",
+                    "after a fall", "with fever", "recurring"]
+
+# Text timestamps use the backend's format (local time, milliseconds), which its change
+# feed compares as strings
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+def format_timestamps(df):
+    df = df.copy()
+    for column in df.select_dtypes(include="datetime").columns:
+        df[column] = df[column].dt.strftime(TIMESTAMP_FORMAT).str[:-3]
+    return df
 
 class HealthcareDataGenerator:
-    def __init__(self, output_dir="../data", num_records=1000, save_as_sql=False):
+    def __init__(self, output_dir="../data", num_records=1000, save_as_sql=False,
+                 output_format="csv", row_group_size=100_000, profile="uniform",
+                 fk_skew=None, start_date=None, end_date=None, seed=None, num_encounters=None):
+        if output_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        if profile not in GENERATION_PROFILES:
+            raise ValueError(f"Unknown generation profile: {profile}")
         self.output_dir = output_dir
         self.num_records = num_records
+        self.num_encounters = num_encounters or num_records
         self.save_as_sql = save_as_sql
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+
+        settings = GENERATION_PROFILES[profile]
+        self.fk_skew = settings["fk_skew"] if fk_skew is None else fk_skew
+        start_date = start_date or settings["start_date"]
+        end_date = end_date or settings["end_date"]
+        self.start_date = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+        self.end_date = date.fromisoformat(end_date) if isinstance(end_date, str) else end_date
+        if (self.start_date is None) != (self.end_date is None):
+            raise ValueError("start_date and end_date must be given together")
+        self.seasonality = settings["seasonality"]
+
+        if seed is not None:
+            random.seed(seed)
+            Faker.seed(seed)
         self.fake = Faker()
         os.makedirs(self.output_dir, exist_ok=True)
         self.sql_statements = []
+        self._parquet_writers = {}
+
+        # Row counts and parent lookups, so every generated foreign key resolves.
+        self.num_hospitals = max(1, self.num_records // 2)
+        self._zipf_cache = {}
+        self._day_cum_weights = None
+        self._department_hospital = {}
+        self._hospital_sites = {}
+        self._encounter_providers = []
+        self._diagnosis_codes = []
 
     def generate_and_save_all(self):
         self._generate_providers()
@@ -21,12 +92,12 @@ class HealthcareDataGenerator:
         self._generate_patients()
         self._generate_provider_assignments()
         self._generate_shifts()
+        self._generate_diagnosis_codes()
         self._generate_encounters()
         self._generate_performance_targets()
         self._generate_provider_metrics()
         self._generate_hospital_admins()
         self._generate_audit_logs()
-        self._generate_diagnosis_codes()
         self._generate_shift_types()
         self._generate_site_departments()
         self._generate_hospital_contacts()
@@ -34,28 +105,127 @@ class HealthcareDataGenerator:
         self._generate_provider_feedback()
         self._generate_provider_leaves()
         self._generate_document_uploads()
+        self._close_parquet_writers()
 
         if self.save_as_sql:
             with open(os.path.join(self.output_dir, "data_dump.sql"), "w") as f:
                 f.writelines(self.sql_statements)
 
     def _save_or_append_csv(self, df, filename, table_name):
-        filepath = os.path.join(self.output_dir, filename)
-        if os.path.exists(filepath):
-            df_existing = pd.read_csv(filepath)
-            df_combined = pd.concat([df_existing, df], ignore_index=True)
+        if self.output_format == "parquet":
+            self._save_or_append_parquet(df, filename.replace(".csv", ".parquet"))
+            df = format_timestamps(df)
         else:
-            df_combined = df
-
-        df_combined.to_csv(filepath, index=False)
+            df = format_timestamps(df)
+            filepath = os.path.join(self.output_dir, filename)
+            df.to_csv(filepath, mode="a", header=not os.path.exists(filepath), index=False)
 
         if self.save_as_sql:
             self.sql_statements.append(f"-- {table_name}\n")
             for _, row in df.iterrows():
-                values = ', '.join([f"'{str(x).replace('\'', '\'\'')}'" if pd.notnull(x) else "NULL" for x in row])
+                values = ', '.join(["'" + str(x).replace("'", "''") + "'" if pd.notnull(x) else "NULL" for x in row])
                 self.sql_statements.append(f"INSERT INTO {table_name} VALUES ({values});\n")
             self.sql_statements.append("\n")
 
+    def _save_or_append_parquet(self, df, filename):
+        """
+        Writes the table as Parquet, keeping dates and timestamps typed. Writers stay open
+        for the whole run so chunked tables stream into one file; a file left by an earlier
+        run is copied into the new one first, so rows are appended as with CSV.
+        """
+        filepath = os.path.join(self.output_dir, filename)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        writer_entry = self._parquet_writers.get(filepath)
+        if writer_entry is None:
+            if os.path.exists(filepath):
+                existing = pq.ParquetFile(filepath)
+                writer = pq.ParquetWriter(filepath + ".tmp", existing.schema_arrow)
+                for batch in existing.iter_batches(batch_size=self.row_group_size):
+                    writer.write_batch(batch, row_group_size=self.row_group_size)
+                existing.close()
+                writer_entry = (writer, filepath + ".tmp")
+            else:
+                writer_entry = (pq.ParquetWriter(filepath, table.schema), None)
+            self._parquet_writers[filepath] = writer_entry
+
+        writer = writer_entry[0]
+        writer.write_table(table.cast(writer.schema), row_group_size=self.row_group_size)
+
+    def _close_parquet_writers(self):
+        for filepath, (writer, tmp_path) in self._parquet_writers.items():
+            writer.close()
+            if tmp_path:
+                os.replace(tmp_path, filepath)
+        self._parquet_writers = {}
+
+    # Helpers for foreign keys and timestamps
+    def _pick_id(self, n):
+        """
+        Picks an id in [1, n]. With a non-zero `fk_skew` ids follow a Zipf distribution,
+        so low ids (e.g. the first few hospitals) dominate like they do in production.
+        """
+        if self.fk_skew <= 0:
+            return random.randint(1, n)
+        cum_weights = self._zipf_cache.get(n)
+        if cum_weights is None:
+            cum_weights, total = [], 0.0
+            for rank in range(1, n + 1):
+                total += 1.0 / rank ** self.fk_skew
+                cum_weights.append(total)
+            self._zipf_cache[n] = cum_weights
+        return random.choices(range(1, n + 1), cum_weights=cum_weights)[0]
+
+    def _event_time(self):
+        """
+        Returns an event timestamp: `datetime.now()` without a date range, otherwise a time
+        within the range shaped by the hourly, weekday and monthly weights.
+        """
+        if self.start_date is None:
+            return datetime.now()
+        if self._day_cum_weights is None:
+            days = (self.end_date - self.start_date).days + 1
+            cum_weights, total = [], 0.0
+            for offset in range(days):
+                day = self.start_date + timedelta(days=offset)
+                weight = 1.0
+                if self.seasonality:
+                    weight = WEEKDAY_WEIGHTS[day.weekday()] * MONTHLY_WEIGHTS[day.month - 1]
+                total += weight
+                cum_weights.append(total)
+            self._day_cum_weights = cum_weights
+
+        offset = random.choices(range(len(self._day_cum_weights)), cum_weights=self._day_cum_weights)[0]
+        if self.seasonality:
+            hour = random.choices(range(24), weights=HOURLY_WEIGHTS)[0]
+        else:
+            hour = random.randrange(24)
+        day = self.start_date + timedelta(days=offset)
+        return datetime(day.year, day.month, day.day, hour, random.randrange(60), random.randrange(60))
+
+    def _row_timestamps(self):
+        created_at = self._event_time()
+        if self.start_date is None:
+            return {"created_at": created_at, "updated_at": datetime.now()}
+        return {"created_at": created_at,
+                "updated_at": created_at + timedelta(days=random.expovariate(1 / 30))}
+
+    def _pick_department(self):
+        department_id = self._pick_id(self.num_records)
+        hospital_id = self._department_hospital.get(department_id)
+        if hospital_id is None:
+            hospital_id = self._pick_id(self.num_hospitals)
+        return department_id, hospital_id
+
+    def _pick_site(self, hospital_id):
+        # Every hospital gets a site in _generate_sites, so this only misses if sites were never generated
+        sites = self._hospital_sites.get(hospital_id)
+        return random.choice(sites) if sites else None
+
+    def _chief_complaint(self):
+        complaint = CHIEF_COMPLAINTS[self._pick_id(len(CHIEF_COMPLAINTS)) - 1]
+        return f"{complaint} {random.choice(COMPLAINT_ONSETS)}".strip()
+
     # Methods for generating data for each table
     def _generate_providers(self):
         df = pd.DataFrame([{
@@ -68,8 +238,7 @@ class HealthcareDataGenerator:
             "phone": self.fake.phone_number(),
             "hire_date": self.fake.date_this_decade(),
             "status": random.choice(["Active", "On Leave", "Terminated"]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records + 1)])
         self._save_or_append_csv(df, "providers.csv", "providers")
 
@@ -82,32 +251,34 @@ class HealthcareDataGenerator:
             "state": self.fake.state_abbr(),
             "zip_code": self.fake.zipcode(),
             "hospital_type": random.choice(["Acute Care", "Trauma Center", "Community"]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records // 2 + 1)])
         self._save_or_append_csv(df, "hospitals.csv", "hospitals")
 
     def _generate_departments(self):
         df = pd.DataFrame([{
             "department_id": i,
-            "hospital_id": random.randint(1, self.num_records // 2),
+            "hospital_id": self._pick_id(self.num_hospitals),
             "name": random.choice(["Emergency", "Pediatrics", "ICU", "Cardiology"]),
             "department_code": self.fake.bothify(text="DEPT-##??"),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records + 1)])
+        self._department_hospital = dict(zip(df["department_id"], df["hospital_id"]))
         self._save_or_append_csv(df, "departments.csv", "departments")
 
     def _generate_sites(self):
         df = pd.DataFrame([{
             "site_id": i,
-            "hospital_id": random.randint(1, self.num_records // 2),
+            # The first sites go one per hospital, so every hospital has somewhere to see patients
+            "hospital_id": i if i <= self.num_hospitals else self._pick_id(self.num_hospitals),
             "name": self.fake.city() + " Site",
             "level_of_service": random.choice(["Level 1 Trauma", "Level 2 Trauma", "Community"]),
             "location_desc": self.fake.catch_phrase(),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records + 1)])
+        self._hospital_sites = {}
+        for site_id, hospital_id in zip(df["site_id"], df["hospital_id"]):
+            self._hospital_sites.setdefault(hospital_id, []).append(site_id)
         self._save_or_append_csv(df, "sites.csv", "sites")
 
     def _generate_patients(self):
@@ -119,79 +290,93 @@ class HealthcareDataGenerator:
             "gender": random.choice(["Male", "Female", "Other"]),
             "contact_phone": self.fake.phone_number(),
             "insurance_provider": self.fake.company(),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records + 1)])
         self._save_or_append_csv(df, "patients.csv", "patients")
 
     def _generate_provider_assignments(self):
         df = pd.DataFrame([{
             "assignment_id": i,
-            "provider_id": random.randint(1, self.num_records),
-            "department_id": random.randint(1, self.num_records),
+            "provider_id": self._pick_id(self.num_records),
+            "department_id": self._pick_id(self.num_records),
             "start_date": self.fake.date_this_year(),
             "end_date": self.fake.date_between(start_date="+1d", end_date="+30d"),
             "status": random.choice(["Active", "Ended"]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records + 1)])
         self._save_or_append_csv(df, "provider_assignments.csv", "provider_assignments")
 
     def _generate_shifts(self):
-        df = pd.DataFrame([{
-            "shift_id": i,
-            "provider_id": random.randint(1, self.num_records),
-            "hospital_id": random.randint(1, self.num_records // 2),
-            "department_id": random.randint(1, self.num_records),
-            "shift_start": datetime.now(),
-            "shift_end": datetime.now() + timedelta(hours=8),
-            "shift_type": random.choice(["Day", "Night", "Swing"]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        } for i in range(1, self.num_records + 1)])
+        rows = []
+        for i in range(1, self.num_records + 1):
+            department_id, hospital_id = self._pick_department()
+            shift_start = self._event_time()
+            rows.append({
+                "shift_id": i,
+                "provider_id": self._pick_id(self.num_records),
+                "hospital_id": hospital_id,
+                "department_id": department_id,
+                "shift_start": shift_start,
+                "shift_end": shift_start + timedelta(hours=8),
+                "shift_type": random.choice(["Day", "Night", "Swing"]),
+                **self._row_timestamps()
+            })
+        df = pd.DataFrame(rows)
         self._save_or_append_csv(df, "shifts.csv", "shifts")
 
     def _generate_encounters(self):
-        df = pd.DataFrame([{
-            "encounter_id": i,
-            "patient_id": random.randint(1, self.num_records),
-            "provider_id": random.randint(1, self.num_records),
-            "hospital_id": random.randint(1, self.num_records // 2),
-            "department_id": random.randint(1, self.num_records),
-            "site_id": random.randint(1, self.num_records),
-            "encounter_date": self.fake.date_time_this_year(),
-            "chief_complaint": self.fake.sentence(),
-            "diagnosis_code": self.fake.lexify(text="D????"),
-            "discharge_disposition": random.choice(["Home", "Admitted", "Transferred"]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        } for i in range(1, self.num_records + 1)])
+        # Encounters can be scaled independently of the other tables, so they are
+        # generated and written in chunks of `row_group_size` rows.
+        self._encounter_providers = []
+        for chunk_start in range(1, self.num_encounters + 1, self.row_group_size):
+            chunk_end = min(chunk_start + self.row_group_size, self.num_encounters + 1)
+            self._generate_encounter_chunk(chunk_start, chunk_end)
+
+    def _generate_encounter_chunk(self, first_id, end_id):
+        rows = []
+        for i in range(first_id, end_id):
+            department_id, hospital_id = self._pick_department()
+            encounter_date = self._event_time() if self.start_date else self.fake.date_time_this_year()
+            code_index = self._pick_id(len(self._diagnosis_codes)) - 1 if self._diagnosis_codes else None
+            rows.append({
+                "encounter_id": i,
+                "patient_id": self._pick_id(self.num_records),
+                "provider_id": self._pick_id(self.num_records),
+                "hospital_id": hospital_id,
+                "department_id": department_id,
+                "site_id": self._pick_site(hospital_id),
+                "encounter_date": encounter_date,
+                "chief_complaint": self._chief_complaint(),
+                "diagnosis_code": self._diagnosis_codes[code_index] if code_index is not None else None,
+                "discharge_disposition": random.choice(["Home", "Admitted", "Transferred"]),
+                **self._row_timestamps()
+            })
+        df = pd.DataFrame(rows)
+        self._encounter_providers.extend(df["provider_id"])
         self._save_or_append_csv(df, "encounters.csv", "encounters")
 
     def _generate_performance_targets(self):
         df = pd.DataFrame([{
             "target_id": i,
-            "department_id": random.randint(1, self.num_records),
+            "department_id": self._pick_id(self.num_records),
             "metric_name": random.choice(["Wait Time", "Patient Satisfaction", "Length of Stay"]),
             "target_value": round(random.uniform(70.0, 100.0), 2),
             "unit": "%",
             "period_start": self.fake.date_this_year(),
             "period_end": self.fake.date_between(start_date="+30d", end_date="+60d"),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "performance_targets.csv", "performance_targets")
 
     def _generate_provider_metrics(self):
         df = pd.DataFrame([{
             "metric_id": i,
-            "provider_id": random.randint(1, self.num_records),
+            "provider_id": self._pick_id(self.num_records),
             "metric_name": random.choice(["Patients Seen", "Avg LOS", "Consults"]),
             "metric_value": round(random.uniform(1.0, 100.0), 2),
             "unit": random.choice(["%", "min", "cases"]),
             "report_date": self.fake.date_this_year(),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "provider_metrics.csv", "provider_metrics")
 
@@ -200,22 +385,21 @@ class HealthcareDataGenerator:
             "admin_id": i,
             "user_name": self.fake.user_name(),
             "email": self.fake.email(),
-            "hospital_id": random.randint(1, self.num_records // 2),
+            "hospital_id": self._pick_id(self.num_hospitals),
             "role": random.choice(["Director", "Admin", "Manager"]),
             "is_active": random.choice([True, False]),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            **self._row_timestamps()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "hospital_admins.csv", "hospital_admins")
 
     def _generate_audit_logs(self):
         df = pd.DataFrame([{
             "log_id": i,
-            "user_id": random.randint(1, self.num_records),
+            "user_id": self._pick_id(max(1, self.num_records - 1)),
             "action": random.choice(["CREATE", "UPDATE", "DELETE"]),
             "entity_type": random.choice(["provider", "encounter", "department"]),
             "entity_id": random.randint(1, self.num_records),
-            "timestamp": datetime.now(),
+            "timestamp": self._event_time(),
             "details": self.fake.sentence()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "audit_logs.csv", "audit_logs")
@@ -226,6 +410,7 @@ class HealthcareDataGenerator:
             "description": self.fake.sentence(),
             "icd_version": random.choice(["ICD-9", "ICD-10"])
         } for _ in range(1, self.num_records)])
+        self._diagnosis_codes = list(df["code"])
         self._save_or_append_csv(df, "diagnosis_codes.csv", "diagnosis_codes")
 
     def _generate_shift_types(self):
@@ -239,16 +424,16 @@ class HealthcareDataGenerator:
     def _generate_site_departments(self):
         df = pd.DataFrame([{
             "id": i,
-            "site_id": random.randint(1, self.num_records),
-            "department_id": random.randint(1, self.num_records),
-            "created_at": datetime.now()
+            "site_id": self._pick_id(self.num_records),
+            "department_id": self._pick_id(self.num_records),
+            "created_at": self._event_time()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "site_departments.csv", "site_departments")
 
     def _generate_hospital_contacts(self):
         df = pd.DataFrame([{
             "contact_id": i,
-            "hospital_id": random.randint(1, self.num_records // 2),
+            "hospital_id": self._pick_id(self.num_hospitals),
             "name": self.fake.name(),
             "role": self.fake.job(),
             "email": self.fake.email(),
@@ -259,44 +444,76 @@ class HealthcareDataGenerator:
     def _generate_provider_specialties(self):
         df = pd.DataFrame([{
             "specialty_id": i,
-            "provider_id": random.randint(1, self.num_records),
+            "provider_id": self._pick_id(self.num_records),
             "specialty_name": self.fake.job()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "provider_specialties.csv", "provider_specialties")
 
     def _generate_provider_feedback(self):
-        df = pd.DataFrame([{
-            "feedback_id": i,
-            "provider_id": random.randint(1, self.num_records),
-            "encounter_id": random.randint(1, self.num_records),
-            "rating": random.randint(1, 5),
-            "comment": self.fake.sentence(),
-            "submitted_at": datetime.now()
-        } for i in range(1, self.num_records)])
+        rows = []
+        for i in range(1, self.num_records):
+            encounter_id = self._pick_id(self.num_encounters)
+            rows.append({
+                "feedback_id": i,
+                "provider_id": self._encounter_providers[encounter_id - 1] if self._encounter_providers
+                               else self._pick_id(self.num_records),
+                "encounter_id": encounter_id,
+                "rating": random.randint(1, 5),
+                "comment": self.fake.sentence(),
+                "submitted_at": self._event_time()
+            })
+        df = pd.DataFrame(rows)
         self._save_or_append_csv(df, "provider_feedback.csv", "provider_feedback")
 
     def _generate_provider_leaves(self):
         df = pd.DataFrame([{
             "leave_id": i,
-            "provider_id": random.randint(1, self.num_records),
+            "provider_id": self._pick_id(self.num_records),
             "start_date": self.fake.date_this_year(),
             "end_date": self.fake.date_between(start_date="+1d", end_date="+30d"),
             "reason": self.fake.sentence(),
             "approved_by": random.randint(1, self.num_records // 2),
-            "created_at": datetime.now()
+            "created_at": self._event_time()
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "provider_leaves.csv", "provider_leaves")
 
     def _generate_document_uploads(self):
         df = pd.DataFrame([{
             "doc_id": i,
-            "provider_id": random.randint(1, self.num_records),
+            "provider_id": self._pick_id(self.num_records),
             "file_name": self.fake.file_name(extension='pdf'),
             "file_type": "application/pdf",
-            "uploaded_at": datetime.now(),
+            "uploaded_at": self._event_time(),
             "uploaded_by": random.randint(1, self.num_records // 2)
         } for i in range(1, self.num_records)])
         self._save_or_append_csv(df, "document_uploads.csv", "document_uploads")
 
-gen = HealthcareDataGenerator(num_records=1000, save_as_sql=False)
-gen.generate_and_save_all()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sample healthcare data.")
+    parser.add_argument("--output-dir", default="../data")
+    parser.add_argument("--num-records", type=int, default=1000)
+    parser.add_argument("--num-encounters", type=int, help="Encounter rows (defaults to --num-records)")
+    parser.add_argument("--save-as-sql", action="store_true")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--row-group-size", type=int, default=100_000)
+    parser.add_argument("--profile", choices=sorted(GENERATION_PROFILES), default="uniform")
+    parser.add_argument("--fk-skew", type=float, help="Zipf exponent for foreign keys (0 = uniform)")
+    parser.add_argument("--start-date", help="YYYY-MM-DD, spreads timestamps over a date range")
+    parser.add_argument("--end-date", help="YYYY-MM-DD")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    gen = HealthcareDataGenerator(
+        output_dir=args.output_dir,
+        num_records=args.num_records,
+        num_encounters=args.num_encounters,
+        save_as_sql=args.save_as_sql,
+        output_format=args.format,
+        row_group_size=args.row_group_size,
+        profile=args.profile,
+        fk_skew=args.fk_skew,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        seed=args.seed
+    )
+    gen.generate_and_save_all()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Deterministic local stand-ins for the `openai` and `ollama` packages, used by the
+benchmarks so the service can be exercised without API keys or a running model server.
+
+`install()` registers fake `openai` / `ollama` modules in `sys.modules`; it must run
+before `ai_service` (or anything importing it) is imported.
+"""
+import sys
+import json
+import time
+import types
+from types import SimpleNamespace
+
+CONFIG = {
+    "openai_latency": 0.05,
+    "ollama_latency": 0.2,
+}
+
+INTENT_RESPONSE = {
+    "intent": {
+        "AUDIO_GENERATION": False,
+        "SQL_QUERY": [True, ""],
+        "DATA_GENERATION": ""
+    }
+}
+
+TABLE_SELECTION_RESPONSE = [{"table": "encounters"}, {"table": "departments"}]
+
+SQL_RESPONSE = (
+    "SELECT d.name, COUNT(*) AS encounters FROM encounters e "
+    "JOIN departments d ON d.department_id = e.department_id GROUP BY d.name ORDER BY encounters DESC LIMIT 10;"
+)
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _canned_openai_content(messages: list, response_format=None) -> str:
+    system_prompt = messages[0]["content"] if messages else ""
+    if "relevant tables" in system_prompt:
+        if response_format is not None:
+            return json.dumps({"tables": TABLE_SELECTION_RESPONSE})
+        return json.dumps(TABLE_SELECTION_RESPONSE)
+    return json.dumps(INTENT_RESPONSE)
+
+class _Completions:
+    def create(self, model: str, messages: list, response_format=None, **kwargs):
+        time.sleep(CONFIG["openai_latency"])
+        content = _canned_openai_content(messages, response_format)
+        prompt_tokens = sum(_count_tokens(m["content"]) for m in messages)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens,
+                                  completion_tokens=_count_tokens(content),
+                                  total_tokens=prompt_tokens + _count_tokens(content))
+        )
+
+class MockOpenAI:
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=_Completions())
+        self.models = SimpleNamespace(list=lambda: SimpleNamespace(data=[]))
+
+class MockOllamaClient:
+    def __init__(self, host: str = None, **kwargs):
+        self.host = host
+
+    def chat(self, model: str, messages: list, **kwargs):
+        time.sleep(CONFIG["ollama_latency"])
+        prompt_tokens = sum(_count_tokens(m["content"]) for m in messages)
+        return {
+            "model": model,
+            "message": {"role": "assistant", "content": SQL_RESPONSE},
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": _count_tokens(SQL_RESPONSE)
+        }
+
+    def list(self):
+        return {"models": []}
+
+def install(openai_latency: float = None, ollama_latency: float = None) -> None:
+    if openai_latency is not None:
+        CONFIG["openai_latency"] = openai_latency
+    if ollama_latency is not None:
+        CONFIG["ollama_latency"] = ollama_latency
+
+    openai_module = types.ModuleType("openai")
+    openai_module.OpenAI = MockOpenAI
+
+    default_client = MockOllamaClient()
+    ollama_module = types.ModuleType("ollama")
+    ollama_module.Client = MockOllamaClient
+    ollama_module.chat = default_client.chat
+    ollama_module.list = default_client.list
+
+    sys.modules["openai"] = openai_module
+    sys.modules["ollama"] = ollama_module
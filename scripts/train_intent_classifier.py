@@ -0,0 +1,124 @@
+"""
+Trains the local intent classifier from logged LLM labels and reports how often it
+agrees with the LLM.
+
+Collect labels by running the service with INTENT_LOG_PATH=./data/intent_log.jsonl,
+then:
+
+    python scripts/train_intent_classifier.py --log ./data/intent_log.jsonl --output ./data/intent_model.json
+
+The exported JSON is loaded by app/intent_classifier.py (INTENT_MODEL_PATH).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "app")
+
+def load_examples(paths: list) -> tuple:
+    texts, labels = [], []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                texts.append(record["text"])
+                labels.append(record["label"])
+    return texts, labels
+
+def export_model(vectorizer, classifier) -> dict:
+    return {
+        "ngram_range": list(vectorizer.ngram_range),
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "vocabulary": {term: int(index) for term, index in vectorizer.vocabulary_.items()},
+        "idf": vectorizer.idf_.tolist(),
+        "classes": [str(label) for label in classifier.classes_],
+        "coef": classifier.coef_.tolist(),
+        "intercept": classifier.intercept_.tolist(),
+    }
+
+def evaluate(model, texts: list, labels: list, threshold: float) -> dict:
+    """
+    Agreement with the LLM labels overall and on the confident subset that would skip the LLM.
+    """
+    predictions, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        predictions.append(model.predict(text))
+        latencies.append(time.perf_counter() - start)
+
+    agree = [label == predicted for (predicted, _), label in zip(predictions, labels)]
+    confident = [ok for ok, (_, confidence) in zip(agree, predictions) if confidence >= threshold]
+    latencies.sort()
+    return {
+        "examples": len(texts),
+        "agreement": round(sum(agree) / len(agree), 4) if agree else 0.0,
+        "threshold": threshold,
+        "coverage": round(len(confident) / len(texts), 4) if texts else 0.0,
+        "confident_agreement": round(sum(confident) / len(confident), 4) if confident else 0.0,
+        "latency_p50_us": round(statistics.median(latencies) * 1e6, 1) if latencies else 0.0,
+        "latency_max_us": round(latencies[-1] * 1e6, 1) if latencies else 0.0,
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Train the local intent classifier from logged LLM labels.")
+    parser.add_argument("--log", nargs="+", required=True, help="JSONL files written via INTENT_LOG_PATH")
+    parser.add_argument("--output", default="./data/intent_model.json")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.9, help="Confidence needed to skip the LLM")
+    parser.add_argument("--ngram-min", type=int, default=2)
+    parser.add_argument("--ngram-max", type=int, default=4)
+    parser.add_argument("--C", type=float, default=10.0, help="Inverse regularization strength")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
+    sys.path.insert(0, APP_DIR)
+    from intent_classifier import LocalIntentClassifier
+
+    texts, labels = load_examples(args.log)
+    if len(set(labels)) < 2:
+        sys.exit("Need examples of at least two intent labels to train.")
+
+    label_counts = {label: labels.count(label) for label in set(labels)}
+    stratify = labels if min(label_counts.values()) >= 2 else None
+    train_texts, test_texts, train_labels, test_labels = train_test_split(
+        texts, labels, test_size=args.test_size, random_state=args.seed, stratify=stratify)
+
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(args.ngram_min, args.ngram_max),
+                                 lowercase=True, sublinear_tf=True)
+    classifier = LogisticRegression(C=args.C, max_iter=2000)
+    classifier.fit(vectorizer.fit_transform(train_texts), train_labels)
+
+    exported = export_model(vectorizer, classifier)
+    local_model = LocalIntentClassifier(exported)
+
+    # The pure-Python scorer must reproduce scikit-learn's probabilities
+    reference = classifier.predict_proba(vectorizer.transform(test_texts[:50]))
+    drift = max((abs(local_model.predict_proba(text)[label] - row[i])
+                 for text, row in zip(test_texts[:50], reference)
+                 for i, label in enumerate(exported["classes"])), default=0.0)
+
+    report = {
+        "labels": label_counts,
+        "train": evaluate(local_model, train_texts, train_labels, args.threshold),
+        "test": evaluate(local_model, test_texts, test_labels, args.threshold),
+        "max_probability_drift_vs_sklearn": drift,
+    }
+    print(json.dumps(report, indent=2))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(exported, f)
+    print(f"Model written to {args.output}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, "scripts"), os.path.join(ROOT_DIR, "app")]
+
+import httpx
+import pytest
+import uvicorn
+import mock_llm
+
+mock_llm.install(openai_latency=0, ollama_latency=0)
+os.environ["WARMUP_AI_SERVICE"] = "false"
+import main
+
+ROWS = 2_500
+BATCH_SIZE = 200
+
+@pytest.fixture(scope="module")
+def base_url(tmp_path_factory):
+    work_dir = tmp_path_factory.mktemp("change_feed")
+    main.DB_PATH = str(work_dir / "feed.db")
+    main.SQL_DUMP_PATH = str(work_dir / "no_dump.sql")
+    main.CHANGE_FEED_BATCH_SIZE = BATCH_SIZE
+    main.initialize_sample_db(force_initialize=True)
+
+    conn = sqlite3.connect(main.DB_PATH)
+    conn.executemany(
+        "INSERT INTO providers (provider_id, first_name, created_at, updated_at) VALUES (?, ?, ?, ?)",
+        [(i, f"p{i}", "2024-01-01 00:00:00.000", f"2024-01-{1 + i % 28:02d} 00:00:00.000")
+         for i in range(1, ROWS + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+def parse_feed(text: str) -> tuple:
+    lines = [json.loads(line) for line in text.splitlines() if line]
+    return lines[:-1], lines[-1]
+
+def test_concurrent_streams_return_every_row(base_url):
+    async def fetch_all():
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            return await asyncio.gather(*(
+                client.get("/changes/providers", params={"limit": 50_000}) for _ in range(8)))
+
+    for response in asyncio.run(fetch_all()):
+        assert response.status_code == 200
+        rows, trailer = parse_feed(response.text)
+        assert len(rows) == ROWS > BATCH_SIZE
+        assert trailer["count"] == ROWS
+        assert trailer["has_more"] is False
+
+def test_watermark_pages_cover_table_once(base_url):
+    seen, params = [], {"limit": 700}
+    while True:
+        rows, trailer = parse_feed(httpx.get(f"{base_url}/changes/providers", params=params).text)
+        seen.extend(row["provider_id"] for row in rows)
+        if not trailer["has_more"]:
+            break
+        params = {"limit": 700, **trailer["watermark"]}
+    assert sorted(seen) == list(range(1, ROWS + 1))
+
+def test_update_through_execute_appears_after_watermark(base_url):
+    _, trailer = parse_feed(httpx.get(f"{base_url}/changes/providers", params={"limit": 50_000}).text)
+    response = httpx.post(f"{base_url}/execute",
+                          json={"query": "UPDATE providers SET status = 'Active' WHERE provider_id = 7"})
+    assert response.status_code == 200
+
+    rows, _ = parse_feed(httpx.get(f"{base_url}/changes/providers", params=trailer["watermark"]).text)
+    assert [row["provider_id"] for row in rows] == [7]
+
+def test_insert_without_timestamp_appears_after_watermark(base_url):
+    _, trailer = parse_feed(httpx.get(f"{base_url}/changes/providers", params={"limit": 50_000}).text)
+    response = httpx.post(f"{base_url}/execute",
+                          json={"query": f"INSERT INTO providers (provider_id, first_name) VALUES ({ROWS + 1}, 'new')"})
+    assert response.status_code == 200
+
+    rows, _ = parse_feed(httpx.get(f"{base_url}/changes/providers", params=trailer["watermark"]).text)
+    assert [row["provider_id"] for row in rows] == [ROWS + 1]
+    assert rows[0]["updated_at"] is not None
+
+def test_insert_only_table_stamps_missing_timestamp(base_url):
+    _, trailer = parse_feed(httpx.get(f"{base_url}/changes/audit_logs").text)
+    response = httpx.post(f"{base_url}/execute",
+                          json={"query": "INSERT INTO audit_logs (action, details) VALUES ('login', 'ok')"})
+    assert response.status_code == 200
+
+    params = {k: v for k, v in trailer["watermark"].items() if v is not None}
+    rows, _ = parse_feed(httpx.get(f"{base_url}/changes/audit_logs", params=params).text)
+    assert [row["action"] for row in rows] == ["login"]
+    assert rows[0]["timestamp"] is not None
+
+def test_touch_trigger_uses_loader_clock_and_format(base_url, monkeypatch):
+    # Off UTC, a UTC trigger stamp would sort before a local-time watermark
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    try:
+        watermark = main._to_sqlite_value(datetime.now())
+        response = httpx.post(f"{base_url}/execute",
+                              json={"query": "UPDATE providers SET status = 'On Leave' WHERE provider_id = 11"})
+        assert response.status_code == 200
+        rows, _ = parse_feed(httpx.get(f"{base_url}/changes/providers",
+                                       params={"since": watermark, "after_id": ROWS + 1}).text)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert [row["provider_id"] for row in rows] == [11]
+    assert len(rows[0]["updated_at"]) == len(watermark)
+
+def test_table_without_timestamps_is_rejected(base_url):
+    response = httpx.get(f"{base_url}/changes/diagnosis_codes")
+    assert response.status_code == 400
+    assert "audit_logs (insert-only)" in response.json()["detail"]
@@ -0,0 +1,88 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, "scripts"), os.path.join(ROOT_DIR, "app")]
+
+import pytest
+import mock_llm
+
+mock_llm.install(openai_latency=0, ollama_latency=0)
+from ai_service import AIService
+from conversation import is_follow_up
+from metrics import SQL_PROMPT_TOKENS
+from prompt_builder import count_tokens
+
+LAST_TURN = {"question": "How many encounters per department?", "tables": ["encounters", "departments"],
+             "sql": mock_llm.SQL_RESPONSE, "result": None}
+
+@pytest.mark.parametrize("question", [
+    "List hospitals that have an ICU",
+    "Which providers have patients that were admitted?",
+    "Is it possible to list all patients born after 1990?",
+    "Order providers by hire date",
+    "Group providers by specialty and count them",
+])
+def test_new_questions_are_not_follow_ups(question):
+    assert not is_follow_up(question, LAST_TURN)
+
+@pytest.mark.parametrize("question", [
+    "now break that down by department",
+    "what about last year?",
+    "sort them by date",
+    "group by hospital",
+    "how many of those",
+    "repeat the previous query for cardiology",
+])
+def test_follow_ups(question):
+    assert is_follow_up(question, LAST_TURN)
+
+def test_no_previous_turn_is_never_a_follow_up():
+    assert not is_follow_up("now break that down by department", None)
+
+@pytest.fixture
+def service(monkeypatch):
+    service = AIService()
+    calls = {"table_selection": 0, "messages": []}
+
+    def table_selections(nl_sql_prompt, **kwargs):
+        calls["table_selection"] += 1
+        return [{"table": "encounters"}, {"table": "departments"}]
+
+    def generate(messages):
+        calls["messages"].append(messages)
+        return mock_llm.SQL_RESPONSE
+
+    monkeypatch.setattr(service, "_table_selections", table_selections)
+    monkeypatch.setattr(service.sql_backends, "generate", generate)
+    service.calls = calls
+    return service
+
+def test_follow_up_reuses_tables_and_adds_context(service):
+    service.generate_sql_query("How many encounters per department?", session_id="s1")
+    service.generate_sql_query("now sort that by count", session_id="s1")
+
+    assert service.calls["table_selection"] == 1
+    assert "Previous SQL:" in service.calls["messages"][-1][0]["content"]
+
+def test_follow_up_naming_new_table_reselects_tables(service):
+    service.generate_sql_query("How many encounters per department?", session_id="s1")
+    service.generate_sql_query("now break that down by provider", session_id="s1")
+
+    assert service.calls["table_selection"] == 2
+    assert "Previous SQL:" in service.calls["messages"][-1][0]["content"]
+
+def test_new_question_in_session_does_not_get_previous_context(service):
+    service.generate_sql_query("How many encounters per department?", session_id="s1")
+    service.generate_sql_query("List hospitals that have an ICU", session_id="s1")
+
+    assert service.calls["table_selection"] == 2
+    assert "Previous SQL:" not in service.calls["messages"][-1][0]["content"]
+
+def test_prompt_tokens_include_follow_up_context(service):
+    service.generate_sql_query("How many encounters per department?", session_id="s1")
+    before = SQL_PROMPT_TOKENS._sum.get()
+    service.generate_sql_query("now sort that by count", session_id="s1")
+
+    system_prompt, question = (m["content"] for m in service.calls["messages"][-1])
+    assert SQL_PROMPT_TOKENS._sum.get() - before == count_tokens(system_prompt) + count_tokens(question)
@@ -0,0 +1,40 @@
+import os
+import sys
+import sqlite3
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, "scripts"), os.path.join(ROOT_DIR, "app")]
+
+import mock_llm
+
+mock_llm.install(openai_latency=0, ollama_latency=0)
+os.environ["WARMUP_AI_SERVICE"] = "false"
+import main
+from fastapi.testclient import TestClient
+
+def test_fts_indexes_are_built_for_existing_db(tmp_path, monkeypatch):
+    # A DB from before the FTS indexes: content tables with rows, no *_fts tables
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE encounters (encounter_id INTEGER PRIMARY KEY, chief_complaint TEXT)")
+    conn.execute("CREATE TABLE provider_feedback (feedback_id INTEGER PRIMARY KEY, comment TEXT)")
+    conn.execute("CREATE TABLE audit_logs (log_id INTEGER PRIMARY KEY, details TEXT)")
+    conn.execute("CREATE TABLE provider_leaves (leave_id INTEGER PRIMARY KEY, reason TEXT)")
+    conn.executemany("INSERT INTO encounters VALUES (?, ?)", [(1, "Chest pain for 2 days"), (2, "Fever")])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(main, "DB_PATH", db_path)
+    monkeypatch.setattr(main, "_fts_ready", False)
+
+    response = TestClient(main.app).post("/execute", json={"query": (
+        "SELECT e.encounter_id FROM encounters e JOIN encounters_fts f ON f.rowid = e.encounter_id "
+        "WHERE encounters_fts MATCH 'chest'")})
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [[1]]
+    # Kept in sync by the triggers from here on
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO encounters VALUES (3, 'Chest tightness')")
+    conn.commit()
+    assert conn.execute("SELECT rowid FROM encounters_fts WHERE encounters_fts MATCH 'chest'").fetchall() == [(1,), (3,)]
+    conn.close()
@@ -0,0 +1,20 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "app"))
+
+import pytest
+from prompt_builder import build_sql_prompt
+
+@pytest.mark.parametrize("question, tables, join_column", [
+    ("what are the most common conditions seen in the ER", ["encounters", "diagnosis_codes"],
+     "encounters.diagnosis_code"),
+    ("how many visits per patient", ["encounters", "patients"], "encounters.patient_id"),
+    ("which admin uploaded documents", ["document_uploads", "hospital_admins"], "document_uploads.uploaded_by"),
+    ("which admin changed records", ["audit_logs", "hospital_admins"], "audit_logs.user_id"),
+])
+def test_join_columns_survive_tight_budget(question, tables, join_column):
+    _, stats = build_sql_prompt(question, [{"table": name} for name in tables], token_budget=40)
+    assert stats["pruned_columns"]
+    assert join_column not in stats["pruned_columns"]
@@ -0,0 +1,176 @@
+import os
+import sys
+import asyncio
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "app"))
+
+import pytest
+import singleflight
+from singleflight import SingleFlight, AsyncSingleFlight
+
+N = 10
+
+@pytest.fixture
+def joined(monkeypatch):
+    """
+    Counts callers that joined an in-flight call, so tests can release the leader only
+    once every follower is attached to it.
+    """
+    counts = {"joined": 0}
+    lock = threading.Lock()
+
+    def record_cache(cache, hit):
+        if hit:
+            with lock:
+                counts["joined"] += 1
+
+    monkeypatch.setattr(singleflight, "record_cache", record_cache)
+    return counts
+
+def wait_for(condition):
+    event = threading.Event()
+    while not condition():
+        event.wait(0.001)
+
+def run_threads(flight, fn, joined):
+    results, errors = [None] * N, [None] * N
+
+    def worker(i):
+        try:
+            results[i] = flight.do("key", fn)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(N)]
+    threads[0].start()
+    wait_for(lambda: "key" in flight._calls)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for(lambda: joined["joined"] == N - 1)
+    return threads, results, errors
+
+def test_concurrent_calls_run_once(joined):
+    flight, release, calls = SingleFlight("test"), threading.Event(), []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return {"rows": 3}
+
+    threads, results, errors = run_threads(flight, fn, joined)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert errors == [None] * N
+    assert all(result is results[0] for result in results) and results[0] == {"rows": 3}
+
+def test_exception_reaches_every_waiter(joined):
+    flight, release = SingleFlight("test"), threading.Event()
+
+    def fn():
+        release.wait()
+        raise ValueError("backend down")
+
+    threads, results, errors = run_threads(flight, fn, joined)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(e, ValueError) and str(e) == "backend down" for e in errors)
+
+def test_key_released_after_call(joined):
+    flight, calls = SingleFlight("test"), []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("first call fails")
+        return len(calls)
+
+    with pytest.raises(ValueError):
+        flight.do("key", fn)
+    assert flight._calls == {}
+    assert flight.do("key", fn) == 2
+    assert flight.do("key", fn) == 3
+
+async def gather_async(flight, fn, joined):
+    tasks = [asyncio.ensure_future(flight.do("key", fn)) for _ in range(N)]
+    while joined["joined"] < N - 1:
+        await asyncio.sleep(0)
+    return tasks
+
+def test_async_concurrent_calls_run_once(joined):
+    flight, calls = AsyncSingleFlight("test"), []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return {"rows": 3}
+
+        tasks = await gather_async(flight, fn, joined)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results) and results[0] == {"rows": 3}
+    assert flight._futures == {}
+
+def test_async_exception_reaches_every_waiter(joined):
+    flight = AsyncSingleFlight("test")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("backend down")
+
+        tasks = await gather_async(flight, fn, joined)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) and str(e) == "backend down" for e in errors)
+
+def test_async_cancelled_waiter_does_not_cancel_others(joined):
+    flight = AsyncSingleFlight("test")
+
+    async def main():
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "done"
+
+        tasks = await gather_async(flight, fn, joined)
+        tasks[0].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks[1:])
+
+    assert asyncio.run(main()) == ["done"] * (N - 1)
+
+def test_async_key_released_after_call(joined):
+    flight, calls = AsyncSingleFlight("test"), []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("first call fails")
+        return len(calls)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await flight.do("key", fn)
+        assert flight._futures == {}
+        return await flight.do("key", fn), await flight.do("key", fn)
+
+    assert asyncio.run(main()) == (2, 3)
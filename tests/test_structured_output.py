@@ -0,0 +1,100 @@
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, "scripts"), os.path.join(ROOT_DIR, "app")]
+
+import pytest
+import mock_llm
+
+mock_llm.install(openai_latency=0, ollama_latency=0)
+from ai_service import AIService
+from structured_output import (IntentResult, TableSelection, StructuredOutputError, extract_json,
+                               parse_model)
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"tables": [{"table": "encounters"}]}\n```',
+    'Sure! Here are the tables:\n{"tables": [{"table": "encounters"}]}\nLet me know if you need more.',
+    'The answer is {"tables": [{"table": "encounters", "schema": "x {not json}"}]} as requested.',
+])
+def test_extracts_fenced_or_wrapped_json(text):
+    assert extract_json(text)["tables"][0]["table"] == "encounters"
+
+def test_python_literal_fallback():
+    text = "Result: {'intent': {'AUDIO_GENERATION': False, 'SQL_QUERY': [True, ''], 'DATA_GENERATION': None}}"
+    intent = extract_json(text)["intent"]
+    assert intent == {"AUDIO_GENERATION": False, "SQL_QUERY": [True, ""], "DATA_GENERATION": None}
+
+def test_code_is_never_evaluated(tmp_path):
+    marker = tmp_path / "pwned"
+    with pytest.raises(StructuredOutputError):
+        extract_json(f"[__import__('pathlib').Path({str(marker)!r}).touch()]")
+    assert not marker.exists()
+
+def test_no_json_raises():
+    with pytest.raises(StructuredOutputError):
+        extract_json("I could not find any relevant tables.")
+
+def test_bare_list_table_selection():
+    selection = parse_model('[{"table": "encounters", "schema": "CREATE TABLE encounters (...)"}, {"table": "sites"}]',
+                            TableSelection)
+    assert [t.table for t in selection.tables] == ["encounters", "sites"]
+    assert selection.tables[0].model_dump(by_alias=True)["schema"].startswith("CREATE TABLE")
+
+@pytest.mark.parametrize("value, expected", [
+    ("true", [True, ""]),
+    ("[true]", [True, ""]),
+    ('[false, null]', [False, ""]),
+    ('[true, "SELECT 1"]', [True, "SELECT 1"]),
+    ("[]", [False, ""]),
+])
+def test_sql_query_normalization(value, expected):
+    result = parse_model(f'{{"intent": {{"SQL_QUERY": {value}}}}}', IntentResult)
+    assert result.intent.SQL_QUERY == expected
+
+def test_invalid_shape_raises():
+    with pytest.raises(StructuredOutputError):
+        parse_model('{"tables": [{"schema": "no table name"}]}', TableSelection)
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(messages)
+        content = self.replies.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+def service_with_replies(*replies):
+    service = AIService()
+    completions = FakeCompletions(replies)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+def run_table_selection(service):
+    return service._structured_completion(
+        stage="table_selection",
+        messages=[{"role": "system", "content": "pick tables"}, {"role": "user", "content": "encounters?"}],
+        result_model=TableSelection,
+        temperature=0
+    )
+
+def test_single_repair_round_trip():
+    service, completions = service_with_replies('{"tables": [{"table": "encounters",}', '{"tables": [{"table": "encounters"}]}')
+
+    result = run_table_selection(service)
+
+    assert [t.table for t in result.tables] == ["encounters"]
+    assert len(completions.calls) == 2
+    repair_messages = completions.calls[1]
+    assert repair_messages[-2] == {"role": "assistant", "content": '{"tables": [{"table": "encounters",}'}
+    assert "could not be parsed" in repair_messages[-1]["content"]
+
+def test_gives_up_after_one_repair():
+    service, completions = service_with_replies("not json", "still not json", '{"tables": []}')
+
+    with pytest.raises(StructuredOutputError):
+        run_table_selection(service)
+    assert len(completions.calls) == 2